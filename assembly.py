@@ -0,0 +1,89 @@
+import os
+from rdflib import URIRef, Graph
+from namespaces import CAMSSA, CAV
+from writer import atomic_file, nt_line
+
+
+class StreamingAssembly:
+    """
+    Streaming assembly of the CAMSS Assessments graph as N-Triples. The migrated triples of each assessment are
+    written to the output as soon as the assessment is migrated, instead of being merged into the in-memory
+    assessments graph. The old subgraphs of all migrated assessments are removed in a single pass over the
+    assessments graph when the assembly is closed, so that memory does not grow with the number of assessments.
+    As in the in-memory assembly, an assessment migrated twice keeps only the results of its last migration.
+    """
+    base: Graph
+    destination: str
+    ass_uris: dict  # byte range of the migrated triples per assessment URI
+    superseded: list  # byte ranges of the migrated triples of assessments migrated again later
+
+    def __init__(self, base: Graph,
+                 destination: str = 'arti/out/CAMSS_Assessments_graph/CAMSS_Assessments_graph.nt'):
+        self.base = base
+        self.destination = destination
+        self.ass_uris = {}
+        self.superseded = []
+        os.makedirs(os.path.dirname(destination), exist_ok=True)
+        self.out = open(destination + '.part', 'wb')
+        return
+
+    def old_results(self, ass_uri: URIRef) -> set:
+        """
+        Provides the statements and scores of an assessment in the assessments graph.
+        :param ass_uri: URI of the assessment
+        :return: set of statement and score nodes
+        """
+        nodes = set()
+        for statement in self.base.objects(ass_uri, CAV.resultsIn):
+            nodes.add(statement)
+            nodes.add(URIRef(CAMSSA + str(self.base.value(statement, CAV.refersTo)).split("/")[-1], CAMSSA))
+        return nodes
+
+    def add(self, ass_id: str, triples: list):
+        """
+        Writes the migrated triples of an assessment, except those kept unchanged from the assessments graph.
+        :param ass_id: identifier of the assessment
+        :param triples: migrated triples of the individual assessment graph
+        :return: triples written
+        """
+        ass_uri = URIRef(CAMSSA + ass_id, CAMSSA)
+        old = self.old_results(ass_uri)
+        start = self.out.tell()
+        for s, p, o in triples:
+            if (s, p, o) in self.base and s not in old and s != ass_uri:
+                continue
+            self.out.write(nt_line((s, p, o)).encode('utf-8'))
+        if ass_uri in self.ass_uris:
+            self.superseded.append(self.ass_uris[ass_uri])
+        self.ass_uris[ass_uri] = (start, self.out.tell())
+        return
+
+    def close(self) -> str:
+        """
+        Removes the old subgraphs of the migrated assessments from the assessments graph in a single pass, writes
+        the rest of it and moves the complete output in place. The triples of superseded migrations are skipped
+        while moving the output, which is only copied if there are any.
+        :return: filepath of the assembled graph
+        """
+        old = set()
+        for s, p, o in self.base.triples((None, CAV.resultsIn, None)):
+            if s in self.ass_uris:
+                old.add(o)
+                old.add(URIRef(CAMSSA + str(self.base.value(o, CAV.refersTo)).split("/")[-1], CAMSSA))
+        for s, p, o in self.base:
+            if s in old or s in self.ass_uris:
+                continue
+            self.out.write(nt_line((s, p, o)).encode('utf-8'))
+        self.out.close()
+        if not self.superseded:
+            os.replace(self.destination + '.part', self.destination)
+            return self.destination
+        # copied into another temporary file, so that an interrupted copy never leaves a truncated output in place
+        with open(self.destination + '.part', 'rb') as part, atomic_file(self.destination) as out:
+            for start, end in sorted(self.superseded) + [(os.path.getsize(self.destination + '.part'), None)]:
+                while part.tell() < start:
+                    out.write(part.read(min(1 << 20, start - part.tell())))
+                if end is not None:
+                    part.seek(end)
+        os.remove(self.destination + '.part')
+        return self.destination
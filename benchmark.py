@@ -0,0 +1,228 @@
+import os
+import io
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import platform
+import resource
+import subprocess
+import contextlib
+import rdflib
+import migration
+from migration import Scenario
+from namespaces import CAMSS, CAMSSA, CAV, CSSV_RSC, SC, STATUS, TOOL
+
+# methods of the individual assessment graphs and the stage of the benchmark they belong to
+STAGES = {'set_graph': 'parse', 'populate_dict_responses': 'populate_dict_responses',
+          'remove_old_subgraph': 'remove_old_subgraph', 'add_results_subgraph': 'add_results_subgraph',
+          'serialize': 'serialize'}
+# words of the synthetic statements
+WORDS = ['specification', 'interoperability', 'public', 'administration', 'standard', 'open', 'criterion', 'data',
+         'european', 'catalogue', 'assessment', 'market', 'maturity', 'security', 'semantic', 'services']
+# scores of 5.1.0 assessments
+SCORES = ['0', '20', '40', '60', '80', '100', '100', '100', '100', '100']
+PREFIXES = f"""@prefix camss: <{CAMSS}> .
+@prefix camssa: <{CAMSSA}> .
+@prefix cav: <{CAV}> .
+@prefix cssvrsc: <{CSSV_RSC}> .
+@prefix owl: <http://www.w3.org/2002/07/owl#> .
+@prefix sc: <{SC}> .
+@prefix status: <{STATUS}> .
+@prefix tool: <{TOOL}> .
+@prefix xsd: <http://www.w3.org/2001/XMLSchema#> .
+
+"""
+
+
+def synthetic_assessment(rng: random.Random, criteria: list, statement_size: int) -> str:
+    """
+    Generates the Turtle body of a synthetic CAMSS Assessment EIF 5.1.0 graph.
+    :param rng: random generator
+    :param criteria: 5.1.0 criteria identifiers, one statement per criterion
+    :param statement_size: number of characters of each statement
+    :return: Turtle triples of the assessment, without prefixes
+    """
+    ass_id = '%064x' % rng.getrandbits(256)
+    results = []
+    body = []
+    for criterion in criteria:
+        statement_id, score_id = (f'{rng.getrandbits(128):032x}' for _ in range(2))
+        words = []
+        while sum(len(word) + 1 for word in words) < statement_size:
+            words.append(rng.choice(WORDS))
+        results.append(f'camssa:{statement_id}')
+        body.append(f'camssa:{statement_id} a cav:Statement, owl:NamedIndividual ;\n'
+                    f'    cav:judgement "{" ".join(words)[:statement_size]}"@en ;\n'
+                    f'    cav:refersTo camssa:{score_id} .\n\n'
+                    f'camssa:{score_id} a cav:Score, owl:NamedIndividual ;\n'
+                    f'    cav:assignedTo sc:c-{criterion} ;\n'
+                    f'    cav:value "{rng.choice(SCORES)}"^^xsd:int .\n\n')
+    head = (f'camssa:{ass_id} a cav:Assessment, owl:NamedIndividual ;\n'
+            f'    camss:assesses cssvrsc:{rng.getrandbits(256):064x} ;\n'
+            f'    camss:assessmentDate "None"^^xsd:date ;\n'
+            f'    camss:submissionDate "None"^^xsd:date ;\n'
+            f'    camss:toolVersion tool:5.1.0 ;\n'
+            f'    cav:contextualisedBy sc:{Scenario.v510} ;\n'
+            f'    cav:status status:Complete ;\n'
+            f'    cav:resultsIn {", ".join(results)} .\n\n')
+    return head + ''.join(body)
+
+
+def generate_corpus(directory: str, count: int, statement_size: int = 400, seed: int = 0) -> str:
+    """
+    Generates a corpus of synthetic CAMSS Assessment EIF 5.1.0 graphs, and the assessments graph holding all of
+    them, with the layout of the project folder: 'arti/in' and a copy of the migration table.
+    :param directory: folder of the corpus
+    :param count: number of assessments
+    :param statement_size: number of characters of each statement
+    :param seed: seed of the random generator
+    :return: folder of the corpus
+    """
+    rng = random.Random(seed)
+    criteria_map = Scenario().criteria_maps[Scenario.v510]
+    criteria = list(criteria_map.source_slots) + list(criteria_map.merged_slots)
+    os.makedirs(os.path.join(directory, 'arti/in/AssessmentsG'), exist_ok=True)
+    for path, source, target in Scenario.tables:
+        if not os.path.isabs(path):
+            shutil.copy(path, os.path.join(directory, path))
+    with open(os.path.join(directory, 'arti/in/AssessmentsG/CAMSS_Ontology_Assessments_graph.ttl'), 'w') as graph:
+        graph.write(PREFIXES)
+        for i in range(count):
+            body = synthetic_assessment(rng, criteria, statement_size)
+            with open(os.path.join(directory, f'arti/in/EIF-5.1.0-CAMSSAssessment_Synthetic {i:06d}.ttl'), 'w') as f:
+                f.write(PREFIXES + body)
+            graph.write(body)
+    with open(os.path.join(directory, 'corpus.json'), 'w') as f:
+        json.dump({'count': count, 'statement_size': statement_size, 'seed': seed}, f)
+    return directory
+
+
+def get_revision():
+    """
+    Provides the git revision of the code being benchmarked, if any.
+    :return: commit identifier or None
+    """
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=os.path.dirname(os.path.abspath(__file__)),
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def get_stages(stages: dict) -> dict:
+    """
+    Groups the metrics of a migration run into the stages of the benchmark. Loading the assessments graph, merging
+    the assessments into it or streaming them, and serialising it are accounted to the assembly.
+    :param stages: metrics of the migration run per stage
+    :return: seconds and calls per stage of the benchmark
+    """
+    timings = {}
+    for name, values in stages.items():
+        scope, method = name.split('.')
+        if scope == 'assessment' and method in STAGES:
+            stage = STAGES[method]
+        elif name in ('main.load', 'main.assembly', 'streaming.add'):
+            stage = 'assembly'
+        else:
+            continue
+        timing = timings.setdefault(stage, {'seconds': 0.0, 'calls': 0})
+        timing['seconds'] += values['seconds']
+        timing['calls'] += values['calls']
+    return timings
+
+
+def run_benchmark(corpus: str, **options) -> dict:
+    """
+    Runs the migration on a corpus and measures it. Stage times are summed over the worker processes, if any.
+    :param corpus: folder of the corpus
+    :param options: options of the main function of the migration
+    :return: machine-readable results
+    """
+    cwd = os.getcwd()
+    os.chdir(corpus)
+    try:
+        if not options.get('incremental'):
+            shutil.rmtree('arti/out', ignore_errors=True)
+        with open('corpus.json') as f:
+            results = json.load(f)
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            migration.main(**dict(options, metrics='json'))
+        total = time.perf_counter() - start
+        with open('arti/out/metrics.json') as f:
+            timings = get_stages(json.load(f)['stages'])
+    finally:
+        os.chdir(cwd)
+    peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+               resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    results.update({'corpus': corpus, 'options': options, 'stages': timings, 'total_seconds': total,
+                    'peak_rss_kb': peak, 'revision': get_revision(), 'python': platform.python_version(),
+                    'rdflib': rdflib.__version__, 'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S')})
+    return results
+
+
+def run_suite(counts: list, statement_sizes: list, results: str, corpora: str = 'bench', options: list = ()):
+    """
+    Runs the benchmark for every corpus size, each in a fresh process so that peak memory is measured separately.
+    Corpora are generated once and reused.
+    :param counts: numbers of assessments
+    :param statement_sizes: numbers of characters of each statement
+    :param results: JSON Lines file where the results are appended
+    :param corpora: folder of the corpora
+    :param options: command-line options of the migration
+    """
+    for count in counts:
+        for statement_size in statement_sizes:
+            corpus = os.path.join(corpora, f'corpus-{count}-{statement_size}')
+            if not os.path.exists(os.path.join(corpus, 'corpus.json')):
+                generate_corpus(corpus, count, statement_size)
+            subprocess.run([sys.executable, os.path.abspath(__file__), 'run', '--corpus', corpus,
+                            '--results', results] + list(options), check=True)
+    return
+
+
+def parse_args(argv: list = None) -> tuple:
+    """
+    Parses the command-line options of the benchmark.
+    :param argv: list of command-line arguments, sys.argv by default
+    :return: the parsed options, and the remaining options, which go to the migration
+    """
+    parser = argparse.ArgumentParser(description='Benchmark of the migration on synthetic corpora.')
+    commands = parser.add_subparsers(dest='command', required=True)
+    generate = commands.add_parser('generate', help='generate a synthetic corpus')
+    generate.add_argument('--count', type=int, default=100, help='number of assessments (default: 100)')
+    generate.add_argument('--statement-size', type=int, default=400,
+                          help='number of characters of each statement (default: 400)')
+    generate.add_argument('--seed', type=int, default=0, help='seed of the random generator (default: 0)')
+    generate.add_argument('--output', help='folder of the corpus (default: bench/corpus-COUNT-SIZE)')
+    for name in ('run', 'suite'):
+        command = commands.add_parser(name, help=f'{name} the benchmark; further options go to the migration')
+        if name == 'run':
+            command.add_argument('--corpus', required=True, help='folder of the corpus')
+        else:
+            command.add_argument('--counts', type=int, nargs='+', default=[100, 1000, 10000],
+                                 help='numbers of assessments (default: 100 1000 10000)')
+            command.add_argument('--statement-sizes', type=int, nargs='+', default=[400],
+                                 help='numbers of characters of each statement (default: 400)')
+        command.add_argument('--results', default='bench/results.jsonl',
+                             help='JSON Lines file where the results are appended (default: bench/results.jsonl)')
+    return parser.parse_known_args(argv)
+
+
+# benchmark
+if __name__ == '__main__':
+    args, migration_args = parse_args()
+    if args.command == 'generate':
+        print(generate_corpus(args.output or f'bench/corpus-{args.count}-{args.statement_size}', args.count,
+                              args.statement_size, args.seed))
+    elif args.command == 'suite':
+        run_suite(args.counts, args.statement_sizes, args.results, options=migration_args)
+    else:
+        results = run_benchmark(args.corpus, **vars(migration.parse_args(migration_args)))
+        os.makedirs(os.path.dirname(os.path.abspath(args.results)), exist_ok=True)
+        with open(args.results, 'a') as f:
+            f.write(json.dumps(results) + '\n')
+        print(json.dumps(results, indent=1))
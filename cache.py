@@ -0,0 +1,137 @@
+import os
+import glob
+import pickle
+import hashlib
+from array import array
+import rdflib
+from rdflib import URIRef, Literal, BNode, Graph
+from manifest import file_hash
+from writer import atomic_file
+
+# version of the format of the cached graphs
+CACHE_FORMAT = 1
+
+
+class ParseCache:
+    """
+    On-disk cache of parsed graphs. A graph is stored as a term dictionary, an array of term indexes (three per
+    triple) and its namespace bindings, which loads several times faster than parsing Turtle. Entries are keyed
+    by the hash of the file, the rdflib version and the cache format, so changes in any of them invalidate them.
+    Entries of files that are no longer inputs are only removed by prune.
+    """
+    directory: str
+    hashes: dict  # hash per filepath of the files already hashed
+    installed: 'ParseCache' = None  # cache of the input graphs in this worker process
+
+    def __init__(self, directory: str = 'arti/cache/', hashes: dict = None):
+        """
+        :param directory: folder of the cache entries
+        :param hashes: hash per filepath of the files already hashed, e.g. the input graphs, which are not read again
+        to compute their key
+        """
+        self.directory = directory
+        self.hashes = hashes or {}
+        return
+
+    def get_key(self, path: str, data: bytes = None) -> str:
+        """
+        Provides the filepath of the cache entry of a file, hashing its content only when it is not already known.
+        :param path: filepath of the RDF file
+        :param data: content of the file, when already read
+        :return: filepath of the cache entry
+        """
+        if data is not None:
+            digest = hashlib.sha256(data).hexdigest()
+        else:
+            digest = self.hashes.get(path) or file_hash(path)
+        return self.entry_path(digest)
+
+    def entry_path(self, digest: str) -> str:
+        """
+        :param digest: hash of the content of a file
+        :return: filepath of the cache entry of the file
+        """
+        return os.path.join(self.directory, f'{digest}-rdflib{rdflib.__version__}-v{CACHE_FORMAT}.pickle')
+
+    def load(self, path: str, data: bytes = None):
+        """
+        Loads a graph from the cache.
+        :param path: filepath of the RDF file
+        :param data: content of the file, when already read
+        :return: the graph, or None if the file is not cached
+        """
+        key = self.get_key(path, data)
+        if not os.path.exists(key):
+            return None
+        with open(key, 'rb') as f:
+            terms, raw, namespaces = pickle.load(f)
+        nodes = []
+        for term in terms:
+            if term[0] == 'u':
+                nodes.append(URIRef(term[1]))
+            elif term[0] == 'b':
+                nodes.append(BNode(term[1]))
+            else:
+                nodes.append(Literal(term[1], lang=term[2], datatype=term[3] and URIRef(term[3])))
+        ids = array('I')
+        ids.frombytes(raw)
+        g = Graph()
+        for prefix, namespace in namespaces:
+            g.bind(prefix, URIRef(namespace), replace=True)
+        g.addN((nodes[ids[i]], nodes[ids[i + 1]], nodes[ids[i + 2]], g) for i in range(0, len(ids), 3))
+        return g
+
+    def store(self, path: str, g: Graph, data: bytes = None):
+        """
+        Stores a parsed graph in the cache.
+        :param path: filepath of the RDF file
+        :param g: the graph parsed from the file
+        :param data: content of the file, when already read
+        :return: cache entry written
+        """
+        index = {}
+        terms = []
+        ids = array('I')
+        # triples are stored per subject, in the order of the objects of each subject and predicate in the parsed
+        # graph, so that merged statements are concatenated in the same order as when parsing the file
+        for triple in (t for subject in sorted(set(g.subjects())) for t in g.triples((subject, None, None))):
+            for term in triple:
+                i = index.get(term)
+                if i is None:
+                    i = index[term] = len(terms)
+                    if isinstance(term, Literal):
+                        terms.append(('l', str(term), term.language, term.datatype and str(term.datatype)))
+                    elif isinstance(term, BNode):
+                        terms.append(('b', str(term)))
+                    else:
+                        terms.append(('u', str(term)))
+                ids.append(i)
+        namespaces = [(prefix, str(namespace)) for prefix, namespace in g.namespaces()]
+        key = self.get_key(path, data)
+        os.makedirs(self.directory, exist_ok=True)
+        with atomic_file(key) as f:
+            pickle.dump((terms, ids.tobytes(), namespaces), f, protocol=pickle.HIGHEST_PROTOCOL)
+        return
+
+    def install(self):
+        """
+        Makes the cache the one of the migrations in this worker process, so that it is sent to the worker once
+        instead of with each of its tasks.
+        :return: cache installed
+        """
+        ParseCache.installed = self
+        return
+
+    def prune(self, digests) -> list:
+        """
+        Removes the entries of files whose hash is not given, e.g. of input graphs that changed or were removed, the
+        entries of other rdflib versions or cache formats, and the temporary files of interrupted runs, so that the
+        cache does not grow from one run to the next.
+        :param digests: hashes of the files whose entries are kept
+        :return: filepaths of the entries removed
+        """
+        keep = {self.entry_path(digest) for digest in digests}
+        removed = [path for path in glob.glob(os.path.join(self.directory, '*')) if path not in keep]
+        for path in removed:
+            os.remove(path)
+        return removed
@@ -0,0 +1,127 @@
+from types import MappingProxyType
+
+
+class CriteriaMap:
+    """
+    Immutable index of the criteria of a source CAMSS EIF scenario in a target one. Each target criterion is a slot
+    of the dictionary of responses; a source criterion either maps to a slot or is merged into it, and slots that
+    no source criterion maps to are new criteria. All lookups are dictionary lookups, and the map can be shared
+    across graph instances and worker processes.
+    """
+    __slots__ = ('source', 'target', 'targets', 'source_slots', 'merged_slots', 'target_slots')
+    source: str  # source scenario identifier
+    target: str  # target scenario identifier
+    targets: tuple  # target criterion per slot
+    source_slots: MappingProxyType  # slot per source criterion
+    merged_slots: MappingProxyType  # slot per merged source criterion
+    target_slots: MappingProxyType  # slot per target criterion
+
+    def __init__(self, source: str, target: str, targets: tuple, source_slots: dict, merged_slots: dict):
+        """
+        :param source: source scenario identifier
+        :param target: target scenario identifier
+        :param targets: target criterion per slot
+        :param source_slots: slot per source criterion
+        :param merged_slots: slot per merged source criterion
+        """
+        target_slots = {}
+        for index, criterion in enumerate(targets):
+            target_slots.setdefault(criterion, index)
+        fields = {'source': source, 'target': target, 'targets': tuple(targets),
+                  'source_slots': MappingProxyType(dict(source_slots)),
+                  'merged_slots': MappingProxyType(dict(merged_slots)), 'target_slots': MappingProxyType(target_slots)}
+        for name, value in fields.items():
+            object.__setattr__(self, name, value)
+        return
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __reduce__(self):
+        return type(self), (self.source, self.target, self.targets, dict(self.source_slots), dict(self.merged_slots))
+
+    def __len__(self) -> int:
+        return len(self.targets)
+
+    def slot(self, criterion: str):
+        """
+        Provides the slot of the dictionary of responses where the responses to a source criterion go, either
+        because it maps to a target criterion or because it is merged into one.
+        :param criterion: source criterion identifier
+        :return: the slot, or None if the criterion is not in the migration table
+        """
+        index = self.source_slots.get(criterion)
+        if index is None:
+            index = self.merged_slots.get(criterion)
+        return index
+
+    def is_merged(self, criterion: str) -> bool:
+        """
+        Checks whether a source criterion is merged into another criterion.
+        :param criterion: source criterion identifier
+        :return: True if the criterion is merged
+        """
+        return criterion in self.merged_slots
+
+    def new_slots(self) -> list:
+        """
+        Provides the slots of the target criteria that no source criterion maps to.
+        :return: list of slots
+        """
+        mapped = set(self.source_slots.values())
+        return [index for index in range(len(self.targets)) if index not in mapped]
+
+    def compose(self, other: 'CriteriaMap') -> 'CriteriaMap':
+        """
+        Composes this map with the map of the next scenario into a direct map, so that an assessment is migrated
+        across several versions in a single pass. A criterion merged in any step is merged in the direct map.
+        :param other: map from the target scenario of this map to a further scenario
+        :return: map from the source scenario of this map to the target scenario of the other map
+        """
+        source_slots, merged_slots = {}, {}
+        for slots, merged in ((self.source_slots, False), (self.merged_slots, True)):
+            for criterion, index in slots.items():
+                step = self.targets[index]
+                slot = other.slot(step)
+                if slot is None:
+                    continue
+                if merged or other.is_merged(step):
+                    merged_slots.setdefault(criterion, slot)
+                else:
+                    source_slots.setdefault(criterion, slot)
+        return CriteriaMap(self.source, other.target, other.targets, source_slots, merged_slots)
+
+
+def read_table(path: str, source: str, target: str) -> CriteriaMap:
+    """
+    Reads a migration table. Each line holds a label, the source criterion ('' for new criteria), the source
+    criterion concatenated with it (criteria merge, '' if none) and the target criterion.
+    :param path: filepath of the csv migration table
+    :param source: source scenario identifier
+    :param target: target scenario identifier
+    :return: the map of criteria
+    """
+    targets, source_slots, merged_slots = [], {}, {}
+    with open(path, 'r') as csv:
+        for index, line in enumerate(csv):
+            ids = line.rstrip().split(",")
+            targets.append(ids[3])
+            # the first slot of a criterion wins, as with list.index
+            if ids[1]:
+                source_slots.setdefault(ids[1], index)
+            if ids[2]:
+                merged_slots.setdefault(ids[2], index)
+    return CriteriaMap(source, target, tuple(targets), source_slots, merged_slots)
+
+
+def identity(scenario: str, targets: tuple) -> CriteriaMap:
+    """
+    Provides the map of the latest scenario onto itself, used for assessments that are already up to date.
+    :param scenario: scenario identifier
+    :param targets: criterion per slot
+    :return: the map of criteria
+    """
+    slots = {}
+    for index, criterion in enumerate(targets):
+        slots.setdefault(criterion, index)
+    return CriteriaMap(scenario, scenario, targets, slots, {})
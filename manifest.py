@@ -0,0 +1,189 @@
+import os
+import json
+import hashlib
+from writer import atomic_file
+
+
+def file_hash(path: str) -> str:
+    """
+    Computes the SHA-256 hash of the content of a file.
+    :param path: filepath of the file
+    :return: hexadecimal digest of the file content
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def tables_hash(tables: list) -> str:
+    """
+    Computes a hash of the registered migration tables, so that any change in them invalidates previous outputs.
+    :param tables: filepath, source scenario and target scenario of each migration table
+    :return: hexadecimal digest of the tables
+    """
+    digest = hashlib.sha256()
+    for path, source, target in tables:
+        digest.update(f'{file_hash(path)},{source},{target};'.encode())
+    return digest.hexdigest()
+
+
+class Manifest:
+    """
+    Manifest of the migrated graphs kept in the output folder. For each input file it records the hash of the input
+    file, the hash of the migration table and the output file, together with the scores of the assessment, so that
+    unchanged assessments can be reused from a previous run without parsing them again.
+    """
+    path: str
+    entries: dict
+
+    def __init__(self, path: str = 'arti/out/manifest.json'):
+        self.path = path
+        self.entries = {}
+        self.load()
+        return
+
+    def load(self):
+        """
+        Reads the manifest of a previous run, if any.
+        :return: sets the entries of the manifest
+        """
+        if os.path.exists(self.path):
+            with open(self.path, 'r') as f:
+                self.entries = json.load(f)['entries']
+        return
+
+    def save(self):
+        """
+        Writes the manifest to the output folder, to a temporary file moved in place once complete, so that an
+        interrupted run leaves the previous manifest instead of a truncated one.
+        :return: manifest saved
+        """
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with atomic_file(self.path, 'w') as f:
+            json.dump({'entries': self.entries}, f, indent=1, sort_keys=True)
+        return
+
+    def is_fresh(self, input_path: str, input_hash: str, table_hash: str, **options) -> bool:
+        """
+        Checks whether an input file has already been migrated with the same content and the same migration table.
+        :param input_path: filepath of the input graph
+        :param input_hash: hash of the input graph
+        :param table_hash: hash of the migration table
+        :param options: options of the migration that change the output, e.g. deterministic URIs
+        :return: True if the previous output can be reused
+        """
+        entry = self.entries.get(input_path)
+        return entry is not None and entry['input_hash'] == input_hash and entry['table_hash'] == table_hash \
+            and all(entry.get(key) == value for key, value in options.items()) and os.path.exists(entry['output'])
+
+    def update(self, input_path: str, input_hash: str, table_hash: str, output: str, **kwargs):
+        """
+        Records the migration of an input file.
+        :param input_path: filepath of the input graph
+        :param input_hash: hash of the input graph
+        :param table_hash: hash of the migration table
+        :param output: filepath of the migrated graph
+        :param kwargs: further fields of the entry, e.g. the scores of the assessment
+        :return: entry updated
+        """
+        self.entries[input_path] = dict(input_hash=input_hash, table_hash=table_hash, output=output, **kwargs)
+        return
+
+    def discard(self, input_paths: set) -> list:
+        """
+        Removes the entries of input files that no longer exist.
+        :param input_paths: filepaths of the current input graphs
+        :return: the input filepaths removed from the manifest
+        """
+        removed = [path for path in self.entries if path not in input_paths]
+        for path in removed:
+            del self.entries[path]
+        return removed
+
+
+class Journal:
+    """
+    Checkpoint journal of a migration run, kept next to the manifest. The manifest entry of each completed
+    assessment, or the error of each failed one, is appended as a JSON line as soon as the assessment is done, so
+    that an interrupted run can be resumed without migrating the completed assessments again. The journal is removed
+    once the manifest of a complete run is saved.
+    """
+    path: str
+    entries: dict  # manifest entry per input file completed by the interrupted run
+    failures: dict  # error per input file failed by the interrupted run
+
+    def __init__(self, path: str = 'arti/out/journal.jsonl', resume: bool = False):
+        """
+        :param path: filepath of the journal
+        :param resume: read the journal of an interrupted run and append to it, instead of starting a new one
+        """
+        self.path = path
+        self.entries = {}
+        self.failures = {}
+        if resume:
+            self.load()
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.out = open(self.path, 'a' if resume else 'w')
+        return
+
+    def load(self):
+        """
+        Reads the journal of an interrupted run, if any. A last line cut short by the interruption is ignored.
+        :return: sets the entries and failures of the journal
+        """
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'r') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if 'error' in record:
+                    self.entries.pop(record['input'], None)
+                    self.failures[record['input']] = record['error']
+                else:
+                    self.failures.pop(record['input'], None)
+                    self.entries[record['input']] = record['entry']
+        return
+
+    def record(self, input_path: str, entry: dict):
+        """
+        Records a completed assessment.
+        :param input_path: filepath of the input graph
+        :param entry: manifest entry of the input graph
+        :return: line appended
+        """
+        self.write({'input': input_path, 'entry': entry})
+        return
+
+    def fail(self, input_path: str, error: str):
+        """
+        Records a failed assessment.
+        :param input_path: filepath of the input graph
+        :param error: error of the migration
+        :return: line appended
+        """
+        self.write({'input': input_path, 'error': error})
+        return
+
+    def write(self, record: dict):
+        """
+        Appends a line to the journal and flushes it, so that it survives an interruption of the run.
+        :param record: record of an assessment
+        :return: line appended
+        """
+        self.out.write(json.dumps(record, sort_keys=True) + '\n')
+        self.out.flush()
+        return
+
+    def close(self):
+        """
+        Removes the journal, once the manifest of the complete run is saved.
+        :return: journal removed
+        """
+        self.out.close()
+        os.remove(self.path)
+        return
@@ -0,0 +1,258 @@
+import os
+import json
+import time
+from functools import wraps
+from rdflib import Graph
+from assembly import StreamingAssembly
+
+# methods of the graph instances that are instrumented
+METHODS = ['set_graph', 'set_eif_version', 'set_ass_id', 'overwrite_graph', 'populate_dict_responses',
+           'set_old_scores', 'remove_old_subgraph', 'add_results_subgraph', 'bind_graph', 'serialize',
+           'set_new_scores', 'merge_results', 'rewrite']
+# methods of the streaming assembly that are instrumented
+ASSEMBLY_METHODS = ['add', 'close']
+FIELDS = ['seconds', 'calls', 'triples_before', 'triples_after', 'bytes_read', 'bytes_written']
+FORMATS = ['json', 'prometheus']
+PROFILERS = ['cprofile', 'pyinstrument']
+
+
+class Metrics:
+    """
+    Per-stage metrics of a migration run: wall time, number of calls, number of triples before and after, and
+    bytes read and written, per stage of the main function and per method of the graph instances. Stages of the
+    individual assessment graphs are named 'assessment.<method>', those of the assessments graph
+    'assessments_graph.<method>', those of the streaming assembly 'streaming.<method>' and those of the main
+    function 'main.<stage>'. Times of methods include the methods they call. The methods are only wrapped while
+    the metrics are installed, so disabled metrics cost nothing. Metrics are written as JSON or in the Prometheus
+    text format, optionally along with a profile of the run by cProfile or pyinstrument (which must be installed).
+    """
+    metrics_format: str
+    profiler: str
+    path: str
+    stages: dict  # values of the fields per stage
+    installed: 'Metrics' = None  # metrics recording the instrumented methods in this process
+
+    def __init__(self, metrics_format: str = None, profiler: str = None, path: str = 'arti/out/metrics'):
+        """
+        :param metrics_format: 'json' or 'prometheus', None to disable the metrics
+        :param profiler: 'cprofile' or 'pyinstrument', None to disable profiling
+        :param path: filepath of the metrics and of the profile, without extension
+        """
+        if metrics_format not in FORMATS + [None]:
+            raise ValueError(f"Unknown format of the metrics: {metrics_format}")
+        if profiler not in PROFILERS + [None]:
+            raise ValueError(f"Unknown profiler: {profiler}")
+        self.metrics_format = metrics_format
+        self.profiler = profiler
+        self.path = path
+        self.stages = {}
+        self.originals = {}
+        self.profile = None
+        self.last = time.perf_counter()
+        return
+
+    @property
+    def enabled(self) -> bool:
+        return self.metrics_format is not None
+
+    def record(self, name: str, seconds: float, triples_before: int = 0, triples_after: int = 0,
+               bytes_read: int = 0, bytes_written: int = 0):
+        """
+        Adds a call to a stage.
+        :param name: name of the stage
+        :param seconds: wall time of the call
+        :param triples_before: number of triples of the graph before the call
+        :param triples_after: number of triples of the graph after the call
+        :param bytes_read: bytes read from files
+        :param bytes_written: bytes written to files
+        :return: stage updated
+        """
+        stage = self.stages.get(name)
+        if stage is None:
+            stage = self.stages[name] = dict.fromkeys(FIELDS, 0)
+            stage['seconds'] = 0.0
+        stage['seconds'] += seconds
+        stage['calls'] += 1
+        stage['triples_before'] += triples_before
+        stage['triples_after'] += triples_after
+        stage['bytes_read'] += bytes_read
+        stage['bytes_written'] += bytes_written
+        return
+
+    def merge(self, stages: dict):
+        """
+        Adds the metrics recorded in another process, e.g. a worker process migrating individual assessments.
+        :param stages: values of the fields per stage
+        :return: stages updated
+        """
+        for name, values in (stages or {}).items():
+            stage = self.stages.setdefault(name, dict.fromkeys(FIELDS, 0))
+            for field in FIELDS:
+                stage[field] += values[field]
+        return
+
+    def drain(self) -> dict:
+        """
+        Takes the metrics recorded so far, e.g. to return them from a worker process.
+        :return: values of the fields per stage
+        """
+        stages, self.stages = self.stages, {}
+        return stages
+
+    def lap(self, name: str, read: list = (), written: list = ()):
+        """
+        Records a stage of the main function, which took the time since the previous lap.
+        :param name: name of the stage
+        :param read: filepaths read during the stage
+        :param written: filepaths written during the stage
+        :return: stage recorded
+        """
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        self.record(f'main.{name}', now - self.last, bytes_read=sum(map(get_size, read)),
+                    bytes_written=sum(map(get_size, written)))
+        self.last = time.perf_counter()
+        return
+
+    def timed(self, method, scope, graph):
+        """
+        Wraps a method so that its calls are recorded.
+        :param method: method of the graph instances or of the streaming assembly
+        :param scope: function giving the scope of the stage for an instance
+        :param graph: function giving the graph an instance works on
+        :return: the wrapped method
+        """
+        name = method.__name__
+
+        @wraps(method)
+        def wrapper(instance, *args, **kwargs):
+            g = graph(instance)
+            before = len(g) if isinstance(g, Graph) else 0
+            bytes_read = get_size(instance.filepath) if name == 'set_graph' else 0
+            position = instance.out.tell() if name == 'add' else 0
+            start = time.perf_counter()
+            try:
+                return method(instance, *args, **kwargs)
+            finally:
+                seconds = time.perf_counter() - start
+                g = graph(instance)
+                if name == 'add':
+                    bytes_written = instance.out.tell() - position
+                elif name == 'close':
+                    bytes_written = get_size(instance.destination)
+                elif name == 'serialize':
+                    bytes_written = get_size(instance.get_destination())
+                else:
+                    bytes_written = 0
+                self.record(f'{scope(instance)}.{name}', seconds, before, len(g) if isinstance(g, Graph) else 0,
+                            bytes_read, bytes_written)
+        return wrapper
+
+    def install(self, graph_class: type):
+        """
+        Wraps the methods of the graph instances and of the streaming assembly so that their calls are recorded,
+        and starts the profiler.
+        :param graph_class: class of the graph instances, passed by the migration, which imports this module
+        :return: methods wrapped
+        """
+        if self.profiler == 'cprofile':
+            import cProfile
+            self.profile = cProfile.Profile()
+            self.profile.enable()
+        elif self.profiler == 'pyinstrument':
+            from pyinstrument import Profiler
+            self.profile = Profiler()
+            self.profile.start()
+        Metrics.installed = self
+        self.last = time.perf_counter()
+        if not self.enabled:
+            return
+        # the graph is not set before set_graph is called
+        targets = [(graph_class, method, graph_scope, lambda instance: getattr(instance, 'g', None))
+                   for method in METHODS] + \
+                  [(StreamingAssembly, method, lambda instance: 'streaming', lambda instance: instance.base)
+                   for method in ASSEMBLY_METHODS]
+        for cls, method, scope, graph in targets:
+            self.originals[(cls, method)] = getattr(cls, method)
+            setattr(cls, method, self.timed(getattr(cls, method), scope, graph))
+        return
+
+    def uninstall(self):
+        """
+        Restores the methods of the graph instances and of the streaming assembly, and stops the profiler.
+        :return: methods restored
+        """
+        for (cls, method), original in self.originals.items():
+            setattr(cls, method, original)
+        self.originals = {}
+        if Metrics.installed is self:
+            Metrics.installed = None
+        if self.profiler == 'cprofile' and self.profile:
+            self.profile.disable()
+        elif self.profiler == 'pyinstrument' and self.profile:
+            self.profile.stop()
+        return
+
+    def close(self) -> list:
+        """
+        Uninstalls the metrics and writes them, and the profile if any.
+        :return: filepaths written
+        """
+        self.uninstall()
+        paths = []
+        if self.enabled or self.profile:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        if self.metrics_format == 'json':
+            paths.append(self.path + '.json')
+            with open(paths[-1], 'w') as f:
+                json.dump({'stages': self.stages}, f, indent=1, sort_keys=True)
+        elif self.metrics_format == 'prometheus':
+            paths.append(self.path + '.prom')
+            with open(paths[-1], 'w') as f:
+                f.write(self.to_prometheus())
+        if self.profiler == 'cprofile' and self.profile:
+            paths.append(self.path + '.prof')
+            self.profile.dump_stats(paths[-1])
+        elif self.profiler == 'pyinstrument' and self.profile:
+            paths.append(self.path + '.html')
+            with open(paths[-1], 'w') as f:
+                f.write(self.profile.output_html())
+        self.profile = None
+        return paths
+
+    def to_prometheus(self) -> str:
+        """
+        Provides the metrics in the Prometheus text exposition format, one counter per field.
+        :return: text of the metrics
+        """
+        lines = []
+        for field in FIELDS:
+            metric = f'camss_migration_stage_{field}' + ('_total' if field != 'seconds' else '')
+            lines.append(f'# HELP {metric} {field.replace("_", " ").capitalize()} per stage of the migration')
+            lines.append(f'# TYPE {metric} counter')
+            for name in sorted(self.stages):
+                lines.append(f'{metric}{{stage="{name}"}} {self.stages[name][field]}')
+        return '\n'.join(lines) + '\n'
+
+
+def graph_scope(instance) -> str:
+    """
+    Provides the scope of the stages of a graph instance: the individual assessment graphs are in the input folder,
+    the assessments graph is either in its subfolder or, when patched, in the output folder.
+    :param instance: graph instance
+    :return: 'assessment' or 'assessments_graph'
+    """
+    return 'assessment' if os.path.dirname(instance.filepath) == 'arti/in' else 'assessments_graph'
+
+
+def get_size(path: str) -> int:
+    """
+    Provides the size of a file.
+    :param path: filepath
+    :return: number of bytes, 0 if the file does not exist
+    """
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
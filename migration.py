@@ -1,51 +1,93 @@
-import os, warnings
+import os, sys, warnings
+import argparse
 import glob
 import uuid
-from rdflib import URIRef, Literal, Namespace, Graph
+from functools import partial
+from rdflib import URIRef, Literal, Graph
 from rdflib.namespace import RDF, OWL, XSD
 import utils
-
+from manifest import Manifest, Journal, file_hash, tables_hash
+from assembly import StreamingAssembly
+from criteria import read_table, identity
+from cache import ParseCache
+from responses import ResponseTable, NO, YES, NOT_APPLICABLE
+from report import ScoresReport, FORMATS
+from metrics import Metrics, FORMATS as METRICS_FORMATS, PROFILERS
+from sinks import open_sink, SINKS
+from pipeline import Pipeline
+from writer import read_graph, save_graph, graph_bytes, get_extension, FORMATS as OUTPUT_FORMATS
+from validation import ShapeValidator, ValidationReport
+from shards import read_shards, write_shards
 # assessment(s) graph namespaces, apart from RDF, OWL and XSD
-CAMSS = Namespace("http://data.europa.eu/2sa#")
-CAMSSA = Namespace("http://data.europa.eu/2sa/assessments/")
-CAV = Namespace("http://data.europa.eu/2sa/cav#")
-CSSV_RSC = Namespace("http://data.europa.eu/2sa/cssv/rsc/")
-SC = Namespace("http://data.europa.eu/2sa/scenarios#")
-SCHEMA = Namespace("http://schema.org/")
-STATUS = Namespace("http://data.europa.eu/2sa/rsc/assessment-status#")
-TOOL = Namespace("http://data.europa.eu/2sa/rsc/toolkit-version#")
+from namespaces import CAMSS, CAMSSA, CAV, CSSV_RSC, SC, SCHEMA, STATUS, TOOL
 
 
 class Scenario:
     """
-    This class generates a dictionary of scenario identifiers and criteria identifiers per scenario (5.1.0 and 6.0.0).
+    This class is the registry of migration tables between CAMSS EIF scenarios. Each table maps the criteria of a
+    scenario to those of a later one; tables are chained and composed into a single map from every registered
+    scenario to the latest scenario, indexed by scenario identifier.
     """
-    dic_criteria: dict = {}
+    criteria_maps: dict = {}
     v510: str = "87c1faa38c024ef8225a36b2c5d472986ac937ab61b86d8e80edd5468c4eab28"
     v600: str = "8022abb075d6aaa372db1471580032cb546e2495fc59d62b0e0df4b8871fe87b"
+    # migration tables: filepath, source scenario identifier, target scenario identifier
+    tables: list = [('migrationtables.csv', v510, v600)]
+    # tool version per scenario identifier
+    versions: dict = {v510: "5.1.0", v600: "6.0.0"}
+    latest: str = v600  # scenario identifier the tables lead to
+    tool_version: str = "6.0.0"  # tool version of the latest scenario
 
     def __init__(self):
-        self.csv = None
         self.load_criteria()
         return
 
+    def register_table(self, path: str, source: str, target: str):
+        """
+        Registers a migration table, e.g. from 5.0.0 to 5.1.0, and composes the maps of criteria again.
+        :param path: filepath of the csv migration table
+        :param source: source scenario identifier
+        :param target: target scenario identifier
+        :return: sets the criteria maps, or raises a ValueError if the table does not fit in the chain of tables
+        """
+        self.tables.append((path, source, target))
+        try:
+            self.load_criteria()
+        except ValueError:
+            # the registry stays as it was
+            self.tables.remove((path, source, target))
+            self.load_criteria()
+            raise
+        return
+
     def load_criteria(self):
         """
-        This method creates a dictionary of criteria per scenario.
-        :return: sets the criteria dictionary
-        """
-        self.csv = open('migrationtables.csv', 'r')
-        self.dic_criteria[self.v510] = []
-        # other refers to criteria from 5.1.0 that is concatenate with other criteria (criteria merge)
-        self.dic_criteria['other'] = []
-        self.dic_criteria[self.v600] = []
-        for line in self.csv:
-            line = line.rstrip()
-            ids = line.split(",")
-            self.dic_criteria[self.v510].append(ids[1])
-            self.dic_criteria['other'].append(ids[2])
-            self.dic_criteria[self.v600].append(ids[3])
-        self.csv.close()
+        This method creates a map of criteria per scenario, composing the chain of tables from the scenario to the
+        latest one.
+        :return: sets the criteria maps, the latest scenario and its tool version
+        """
+        steps = {}
+        for path, source, target in self.tables:
+            if source in steps:
+                raise ValueError(f"Several migration tables have the source scenario {source}")
+            steps[source] = read_table(path, source, target)
+        latest = {step.target for step in steps.values() if step.target not in steps}
+        if len(latest) != 1:
+            raise ValueError(f"The migration tables do not lead to a single latest scenario: {latest}")
+        latest = latest.pop()
+        if latest not in self.versions:
+            raise ValueError(f"The tool version of the latest scenario {latest} is unknown")
+        self.criteria_maps.clear()
+        for source, criteria_map in steps.items():
+            chain = [source]
+            while criteria_map.target in steps:
+                if criteria_map.target in chain:
+                    raise ValueError(f"The migration tables contain a cycle: {chain}")
+                chain.append(criteria_map.target)
+                criteria_map = criteria_map.compose(steps[criteria_map.target])
+            self.criteria_maps[source] = criteria_map
+        self.criteria_maps[latest] = identity(latest, criteria_map.targets)
+        Scenario.latest, Scenario.tool_version = latest, self.versions[latest]
         return
 
 
@@ -63,30 +105,54 @@ class GraphInstance:
     sc510_id: str = "87c1faa38c024ef8225a36b2c5d472986ac937ab61b86d8e80edd5468c4eab28"
     sc600_id: str = "8022abb075d6aaa372db1471580032cb546e2495fc59d62b0e0df4b8871fe87b"
     tool_version: str
-    dict_crit: dict = Scenario().dic_criteria
-    dict_responses: dict
+    criteria_maps: dict = Scenario.criteria_maps  # loaded on first use
+    responses: ResponseTable  # responses per criterion of the latest scenario
     responses_old: list # number of not answered, n/a, no, yes responses
-    responses_new: list = [None, None, None, None]  # number of not answered, n/a, no, yes responses
-    responses_new_df: dict = {}
-    g_scores: dict = {}
+    responses_new: list  # number of not answered, n/a, no, yes responses
+    scores: list  # old and new automated and strength scores, and previous EIF version
+    deterministic: bool = False  # content-derived instead of random identifiers of scores and statements
+    cache: ParseCache = None  # on-disk cache of parsed graphs
+    data: bytes = None  # content of the file, when already read
+    output_format: str = 'turtle'  # format of the serialised graph, 'turtle' or 'nt'
+    compress: bool = False  # gzip-compressed serialised graph
+    shards: int = 0  # number of N-Triples shards of the serialised assessments graph, 0 for a single file
+    issues: list  # issues found while migrating, e.g. criteria that are not in the migration table
+    validator: ShapeValidator = None  # checks of the migrated graphs, compiled on first use
 
-    def __init__(self, file_path: str):
+    def __init__(self, file_path: str, deterministic: bool = False, cache: ParseCache = None, data: bytes = None,
+                 output_format: str = 'turtle', compress: bool = False, shards: int = 0):
         self.filepath = file_path
+        self.deterministic = deterministic
+        self.cache = cache
+        self.data = data
+        self.output_format = output_format
+        self.compress = compress
+        self.shards = shards
+        if not self.criteria_maps:
+            Scenario()
         self.set_graph()
-        self.ttl_filename = utils.set_name(file_path[:-4].split("/")[-1])
-        self.dict_responses = {'stmt': ['None'] * 45, 'old_score': ['None'] * 45, 'score': ['None'] * 45,
-                                'criteria': ['None'] * 45, 'answer': ['None'] * 45}
+        name = file_path[:-3] if file_path.endswith('.gz') else file_path
+        self.ttl_filename = utils.set_name(os.path.splitext(name)[0].split("/")[-1])
+        self.responses = ResponseTable(len(self.criteria_maps[Scenario.latest]))
+        self.responses_new = [None, None, None, None]
+        self.scores = []
+        self.issues = []
         return
 
     def set_graph(self):
         """
-        Reads a ttl file and transforms it to an rdflib graph instance.
+        Reads a ttl file, or an N-Triples, gzip-compressed or sharded file written by the migration, and transforms
+        it to an rdflib graph instance, from the parse cache when it is enabled and holds the file.
         :return: sets the graph
         """
-        data = open(self.filepath, 'rb')
-        self.g = Graph()
-        self.g.parse(data, format='turtle')
-        data.close()
+        self.g = self.cache.load(self.filepath, self.data) if self.cache else None
+        if self.g is None:
+            # the index of a sharded assessments graph
+            self.g = read_shards(self.filepath) if self.filepath.endswith('.json') else \
+                read_graph(self.filepath, self.data)
+            if self.cache:
+                self.cache.store(self.filepath, self.g, self.data)
+        self.data = None
         return
 
     def set_eif_version(self):
@@ -114,55 +180,123 @@ class GraphInstance:
         Adds new subgraphs. This method complements the overwrite_graph method.
         :return: addition of a specific subgraph
         """
-        for index in range(len(self.dict_responses['criteria'])):
+        self.rewrite(set(), self.results_subgraph())
+        return
+
+    def results_subgraph(self) -> list:
+        """
+        Generates the new results subgraph from the dictionary of responses.
+        :return: list of triples of the new scores and statements, and of the results of the assessment
+        """
+        triples = []
+        ass_uri = URIRef(CAMSSA + self.ass_id, CAMSSA)
+        for index in range(len(self.responses)):
             # Score
-            score_uri = URIRef(CAMSSA + str(uuid.uuid4()), CAMSSA)
-            self.g.add((score_uri, RDF.type, CAV.Score))
-            self.g.add((score_uri, RDF.type, OWL.NamedIndividual))
-            self.g.add((score_uri, CAV.value, Literal(self.dict_responses['score'][index], datatype=XSD.int)))
-            self.g.add((score_uri, CAV.assignedTo, URIRef(SC + 'c-' + self.dict_responses['criteria'][index], SC)))
+            score_uri = self.new_uri(index, 'score')
+            triples.append((score_uri, RDF.type, CAV.Score))
+            triples.append((score_uri, RDF.type, OWL.NamedIndividual))
+            triples.append((score_uri, CAV.value, Literal(self.responses.get_score(index), datatype=XSD.int)))
+            triples.append((score_uri, CAV.assignedTo, URIRef(SC + 'c-' + self.responses.get_criterion(index), SC)))
             # Statement
-            statement_uri = URIRef(CAMSSA + str(uuid.uuid4()), CAMSSA)
-            self.g.add((statement_uri, RDF.type, CAV.Statement))
-            self.g.add((statement_uri, RDF.type, OWL.NamedIndividual))
-            self.g.add((statement_uri, CAV.refersTo, score_uri))
-            self.g.add((statement_uri, CAV.judgement, Literal(self.dict_responses['stmt'][index], lang='en')))
+            statement_uri = self.new_uri(index, 'statement')
+            triples.append((statement_uri, RDF.type, CAV.Statement))
+            triples.append((statement_uri, RDF.type, OWL.NamedIndividual))
+            triples.append((statement_uri, CAV.refersTo, score_uri))
+            triples.append((statement_uri, CAV.judgement, Literal(self.responses.get_statement(index), lang='en')))
             # Assessment
-            ass_uri = URIRef(CAMSSA + self.ass_id, CAMSSA)
-            self.g.add((ass_uri, CAV.resultsIn, statement_uri))
-        return
+            triples.append((ass_uri, CAV.resultsIn, statement_uri))
+        return triples
+
+    def new_uri(self, index: int, role: str) -> URIRef:
+        """
+        Generates the identifier of a new score or statement. In deterministic mode the identifier is a name-based
+        UUID derived from the assessment identifier, the criterion identifier and the role, so that migrating the
+        same input twice gives the same graph.
+        :param index: index of the criterion in the dictionary of responses
+        :param role: either 'score' or 'statement'
+        :return: URI of the new node
+        """
+        if not self.deterministic:
+            return URIRef(CAMSSA + str(uuid.uuid4()), CAMSSA)
+        criterion = self.responses.get_criterion(index)
+        name = f"{self.ass_id}/{criterion if criterion != 'None' else index}/{role}"
+        return URIRef(CAMSSA + str(uuid.uuid5(uuid.NAMESPACE_URL, CAMSSA + name)), CAMSSA)
 
     def remove_old_subgraph(self):
         """
         Removes either a subgraph contained in an assessment graph, or an assessment graph from the assessments graph.
         :return: removal of a specific subgraph
         """
-        for s, p, o in self.g.triples((URIRef(CAMSSA + self.ass_id, CAMSSA), CAV.resultsIn, None)):
+        self.rewrite(self.old_subgraph(self.ass_id), [])
+        return
+
+    def old_subgraph(self, ass_id: str) -> set:
+        """
+        Collects the old results subgraph of an assessment, without modifying the graph.
+        :param ass_id: identifier of the assessment
+        :return: set of triples of the old results, statements and scores
+        """
+        triples = set()
+        for s, p, o in self.g.triples((URIRef(CAMSSA + ass_id, CAMSSA), CAV.resultsIn, None)):
             # original identifier of the criterion score (old CAMSS EIF scenario)
             id_score = str(self.g.value(subject=o, predicate=CAV.refersTo, any=None)).split("/")[-1]
-            # remove old results
-            self.g.remove((s, p, o))
-            # remove old statements
-            self.g.remove((o, None, None))
-            # remove old scores
-            self.g.remove((URIRef(CAMSSA + id_score, CAMSSA), None, None))
+            # old results
+            triples.add((s, p, o))
+            # old statements
+            triples.update(self.g.triples((o, None, None)))
+            # old scores
+            triples.update(self.g.triples((URIRef(CAMSSA + id_score, CAMSSA), None, None)))
+        return triples
+
+    def rewrite(self, delete: set, insert: list):
+        """
+        Applies a batch of deletions and insertions to the graph. When most of the graph is deleted, a new graph is
+        built from the remaining triples instead of removing the triples one by one from the indexes.
+        :param delete: set of triples to delete
+        :param insert: list of triples to insert, after the deletions
+        :return: graph rewritten
+        """
+        if len(delete) > len(self.g) // 2:
+            g = Graph(bind_namespaces='none')
+            for prefix, namespace in self.g.namespaces():
+                g.bind(prefix, namespace, override=True, replace=True)
+            g.addN((s, p, o, g) for s, p, o in self.g if (s, p, o) not in delete)
+            self.g = g
+        else:
+            for triple in delete:
+                self.g.remove(triple)
+        self.g.addN((s, p, o, self.g) for s, p, o in insert)
         return
 
-    def serialize(self):
+    def serialize(self, write=None):
         """
-        Serialises to a ttl file in a specific folder locally.
+        Serialises to a ttl file, or an N-Triples or gzip-compressed file, in a specific folder locally. A sharded
+        assessments graph is serialised to N-Triples shards and their index.
+        :param write: function writing the serialised graph to its destination instead, e.g. in another thread
         :return: serialization completed
         """
         # Save to file
-        if self.ttl_filename == 'CAMSS_Assessments_graph':
-            destination = f'arti/out/{self.ttl_filename}/'
-            os.makedirs(destination, exist_ok=True)
-            self.g.serialize(format="turtle", destination=destination + self.ttl_filename + ".ttl")
-        else:
-            destination = 'arti/out/'
-            self.g.serialize(format='turtle', destination=destination + f'EIF-6.0.0-CAMSSAssessment_{self.ttl_filename}.ttl')
+        destination = self.get_destination()
+        if self.shards:
+            write_shards(self.g, destination, self.shards)
+            return
+        if write:
+            write(destination, graph_bytes(self.g, self.output_format, self.compress))
+            return
+        os.makedirs(os.path.dirname(destination), exist_ok=True)
+        save_graph(self.g, destination, self.output_format, self.compress)
         return
 
+    def get_destination(self) -> str:
+        """
+        Provides the filepath where the graph is serialised.
+        :return: filepath of the ttl file, or of the N-Triples or gzip-compressed file, or of the index of the shards
+        """
+        extension = '.json' if self.shards else get_extension(self.output_format, self.compress)
+        if self.ttl_filename == 'CAMSS_Assessments_graph':
+            return f'arti/out/{self.ttl_filename}/{self.ttl_filename}{extension}'
+        return f'arti/out/EIF-6.0.0-CAMSSAssessment_{self.ttl_filename}{extension}'
+
     def bind_graph(self):
         """
         This method allows to ensure that all URIs are well-defined.
@@ -183,23 +317,30 @@ class GraphInstance:
         Overwrites certain content of the individual assessment graphs or the assessments graph.
         :return: graph resulting after some modifications
         """
-        # modify the scenario version identifier
-        self.g.set((URIRef(CAMSSA + self.ass_id, CAMSSA), CAV.contextualisedBy, URIRef(SC + self.sc600_id, SC)))
-        # modify dates
-        self.g.set(
-            (URIRef(CAMSSA + self.ass_id, CAMSSA), CAMSS.assessmentDate, Literal(None, datatype=URIRef(XSD.date))))
-        self.g.set(
-            (URIRef(CAMSSA + self.ass_id, CAMSSA), CAMSS.submissionDate, Literal(None, datatype=URIRef(XSD.date))))
-        # modify the CAMSS EIF scenario version
-        self.g.set((URIRef(CAMSSA + self.ass_id, CAMSSA), CAMSS.toolVersion, URIRef(TOOL + "6.0.0", TOOL)))
+        for triple in self.overwrites(self.ass_id):
+            self.g.set(triple)
         return
 
+    def overwrites(self, ass_id: str) -> list:
+        """
+        Provides the values of the assessment that the migration overwrites.
+        :param ass_id: identifier of the assessment
+        :return: list of triples, one per overwritten predicate
+        """
+        ass_uri = URIRef(CAMSSA + ass_id, CAMSSA)
+        # the scenario version identifier, the dates and the CAMSS EIF scenario version
+        return [(ass_uri, CAV.contextualisedBy, URIRef(SC + Scenario.latest, SC)),
+                (ass_uri, CAMSS.assessmentDate, Literal(None, datatype=URIRef(XSD.date))),
+                (ass_uri, CAMSS.submissionDate, Literal(None, datatype=URIRef(XSD.date))),
+                (ass_uri, CAMSS.toolVersion, URIRef(TOOL + Scenario.tool_version, TOOL))]
+
     def populate_dict_responses(self):
         """
         This method populates the dictionary of responses from the old Assessment. Mapping of criteria.
         :return: population of the dictionary of responses
         """
         self.responses_old = [0, 0, 0, 0]
+        criteria_map = self.criteria_maps[self.eif_version]
         # s stands for subject, p stands for predicate, o stands for object
         for s, p, o in self.g.triples((URIRef(CAMSSA + self.ass_id, CAMSSA), CAV.resultsIn, None)):
             # original statement for a specific criterion (old CAMSS EIF scenario)
@@ -215,41 +356,42 @@ class GraphInstance:
             id_criterion = str(self.g.value(subject=URIRef(CAMSSA + str(id_score), CAMSSA), predicate=CAV.assignedTo,
                                             any=None)).split("/")[-1].split("c-")[-1]
             # populate dictionary with responses for lately creating subgraph
-            if id_criterion in self.dict_crit[self.eif_version]:
-                #equivalent criterion id in sc600
-                equiv_id_criterion = self.dict_crit[self.sc600_id][
-                    self.dict_crit[self.eif_version].index(id_criterion)]
-                #dictionary index
-                index = self.dict_crit[self.sc600_id].index(equiv_id_criterion)
-            elif id_criterion in self.dict_crit['other']:
-                equiv_id_criterion = self.dict_crit['other'][self.dict_crit['other'].index(id_criterion)]
-                index = self.dict_crit['other'].index(equiv_id_criterion)
-            # merging statements for criteria
-            if self.dict_responses['stmt'][index] == 'None':
-                self.dict_responses['stmt'][index] = statement
-            elif self.dict_responses['stmt'][index] != 'None':
-                self.dict_responses['stmt'][index] += "\n\n" + statement
-            # score mapping from 5.1.0 to 6.0.0
-            if self.dict_responses['score'][index] == 'None':
-                self.dict_responses['score'][index] = str(score)
-            elif self.dict_responses['score'][index] != 'None':
-                self.dict_responses['score'][index] += "+" + str(score)
+            # dictionary index of the equivalent criterion in sc600, or of the criterion it is merged into
+            index = criteria_map.slot(id_criterion)
+            if index is None:
+                # the response has no slot and is not migrated, which the validation reports
+                self.issues.append(f"criterion c-{id_criterion} is not in the migration table, its response is not "
+                                   f"migrated")
+                continue
+            # merging statements and scores for criteria, score mapping from 5.1.0 to 6.0.0
+            self.responses.add(index, statement, str(score))
             # mapping of criteria that are preserved in 6.0.0
-            if id_criterion not in self.dict_crit['other']:
-                self.dict_responses['criteria'][index] = self.dict_crit[self.sc600_id][index]
-            if self.dict_responses['old_score'][index] == "20" or self.dict_responses['old_score'][index] == "0":
-                self.dict_responses['answer'][index] = 'No/Gradient'
+            if not criteria_map.is_merged(id_criterion):
+                self.responses.criteria[index] = criteria_map.targets[index]
+            if self.responses.get_old_score(index) == "20" or self.responses.get_old_score(index) == "0":
+                self.responses.answers[index] = NO
         # population of new criteria - by default, None for statement and 100 (N/A) for score
-        unfilled_criteria = [i for i, x in enumerate(self.dict_crit[self.eif_version]) if
-                             x == '']
-        for i in unfilled_criteria:
-            #index = self.dict_crit[self.sc510_id].index(self.dict_crit[self.sc510_id][i])
-            index = self.dict_crit[self.sc600_id].index(self.dict_crit[self.sc600_id][i])
-            self.dict_responses['stmt'][index] = 'None'
-            self.dict_responses['score'][index] = '100'
-            #self.dict_responses['criteria'][index] = self.dict_crit[self.sc510_id][i]
-            self.dict_responses['criteria'][index] = self.dict_crit[self.sc600_id][i]
-            self.dict_responses['answer'][index] = 'Not Applicable'
+        for index in criteria_map.new_slots():
+            self.responses.set(index, criteria_map.targets[index], score='100', answer=NOT_APPLICABLE)
+
+    def merge_results(self, results: list):
+        """
+        Replaces the subgraphs of assessments in the assessments graph, i.e. their results and every triple about the
+        assessment itself, by the migrated individual assessment graphs, in a single batch of deletions and insertions. An assessment migrated twice keeps only its last migration.
+        :param results: results of the migration of the individual assessment graphs
+        :return: assessments graph updated
+        """
+        self.eif_version = Scenario.latest
+        latest = {result.ass_id: result for result in results}
+        delete, insert = set(), []
+        for ass_id, result in latest.items():
+            # all the triples of the assessment are replaced, so that patching a previous output drops its values
+            delete.update(self.old_subgraph(ass_id))
+            delete.update(self.g.triples((URIRef(CAMSSA + ass_id, CAMSSA), None, None)))
+            insert.extend(result.load_triples())
+        self.rewrite(delete, insert)
+        return
+
     def set_old_scores(self):
         """
         This method generates the old automated Score and the assessment strength. Unused in migration from 5.1.0 to 6.0.0.
@@ -257,12 +399,12 @@ class GraphInstance:
         """
         # generate scores
         # scores
-        self.g_scores[self.ttl_filename] = []
+        self.scores = []
         # old scores for v300 and v310: automated and strength
         total_old = sum(self.responses_old)
-        self.g_scores[self.ttl_filename].append(
+        self.scores.append(
             round((self.responses_old[3] / (total_old - self.responses_old[1])) * 100))
-        self.g_scores[self.ttl_filename].append(
+        self.scores.append(
             round(((self.responses_old[3] + self.responses_old[2]) / total_old) * 100))
 
     def set_new_scores(self):
@@ -271,13 +413,13 @@ class GraphInstance:
         :return: dictionary of old scores and new scores
         """
         # new scores
-        pos_ans = sum([1 for i in self.dict_responses['answer'] if i == 'Yes/Gradient'])
-        neg_ans = sum([1 for i in self.dict_responses['answer'] if i == 'No/Gradient'])
-        not_app = sum([1 for i in self.dict_responses['answer'] if i == 'Not Applicable'])
-        total_new = 45 - (1 if self.dict_responses['answer'][1] in ['Not Applicable'] else 0)
-        self.g_scores[self.ttl_filename].append(
+        pos_ans = self.responses.count(YES)
+        neg_ans = self.responses.count(NO)
+        not_app = self.responses.count(NOT_APPLICABLE)
+        total_new = len(self.responses) - (1 if self.responses.answers[1] == NOT_APPLICABLE else 0)
+        self.scores.append(
             round((pos_ans / (total_new - not_app)) * 100))
-        self.g_scores[self.ttl_filename].append(
+        self.scores.append(
             round(((pos_ans + neg_ans) / total_new) * 100))
         # populate the dictionary of new responses where the number of not applicable, negative and positive answers is given
         self.responses_new[0] = 0
@@ -286,97 +428,454 @@ class GraphInstance:
         self.responses_new[3] = pos_ans
 
 
-def run(param: str = 'arti/in/'):
+class MigrationResult:
+    """
+    Compact result of the migration of an individual assessment graph. This is what a worker process sends back to
+    the main process, which merges it into the assessments graph and the table of scores. Results reused from a
+    previous run come without triples, which are read from the output file only when needed.
+    """
+    input_path: str
+    output: str
+    ass_id: str
+    ttl_filename: str
+    tool_version: str
+    scores: list  # old and new automated and strength scores, and previous EIF version
+    responses_new: list  # number of not answered, n/a, no, yes responses
+    triples: list  # migrated triples of the individual assessment graph
+    metrics: dict  # metrics recorded in the worker process, if any
+    issues: list  # issues found by the validation, None if not validated
+    error: str  # error of a failed migration, None if it succeeded
+
+    def __init__(self, input_path: str, output: str, ass_id: str, ttl_filename: str, tool_version: str,
+                 scores: list, responses_new: list, triples: list = None, metrics: dict = None, issues: list = None,
+                 error: str = None):
+        self.input_path = input_path
+        self.output = output
+        self.ass_id = ass_id
+        self.ttl_filename = ttl_filename
+        self.tool_version = tool_version
+        self.scores = scores
+        self.responses_new = responses_new
+        self.triples = triples
+        self.metrics = metrics
+        self.issues = issues
+        self.error = error
+        return
+
+    def to_dict(self) -> dict:
+        """
+        Provides the fields of the result that are recorded in the manifest, i.e. all but the triples.
+        :return: dictionary of the assessment identifier, names, version, scores and issues
+        """
+        return {'ass_id': self.ass_id, 'ttl_filename': self.ttl_filename, 'tool_version': self.tool_version,
+                'scores': self.scores, 'responses_new': self.responses_new, 'issues': self.issues}
+
+    def load_triples(self) -> list:
+        """
+        Reads the migrated triples from the output file when the result has been reused from a previous run.
+        :return: the migrated triples
+        """
+        if self.triples is None:
+            self.triples = list(read_graph(self.output))
+        return self.triples
+
+
+def run(param: str = 'arti/in/', **options):
     """
     Use it to run the code from a python console, Jupyter Lab or Notebook, etc.
+    :param options: options of the main function, e.g. workers=4
+    """
+    main(**options)
+    return
+
+
+def register_tables(tables: list):
     """
-    main()
+    Registers further migration tables in this process, e.g. in each worker process.
+    :param tables: filepath, source scenario identifier and target scenario identifier of each migration table
+    """
+    for table in tables:
+        if tuple(table) not in Scenario.tables:
+            Scenario().register_table(*table)
+    return
+
+
+def init_worker(tables: list, metrics: bool = False, cache: ParseCache = None):
+    """
+    Initialises a worker process: registers the migration tables and, if enabled, the metrics of the migrations and
+    the parse cache.
+    :param tables: filepath, source scenario identifier and target scenario identifier of each migration table
+    :param metrics: record the metrics of the migrations, which are sent back with their results
+    :param cache: on-disk cache of parsed graphs, if any
+    """
+    register_tables(tables)
+    ParseCache.installed = None
+    if cache:
+        cache.install()
+    # forked worker processes inherit the metrics of the main process, which are not sent back
+    if Metrics.installed:
+        Metrics.installed.uninstall()
+    if metrics:
+        Metrics('json').install(GraphInstance)
     return
 
 
-def main():
+def shape_validator() -> ShapeValidator:
+    """
+    Provides the checks of the migrated individual assessment graphs, compiled on first use in each process.
+    :return: the validator of the shape of the latest scenario
+    """
+    if not Scenario.criteria_maps:
+        Scenario()
+    context = URIRef(SC + Scenario.latest, SC)
+    # compiled again once a table leads to a later scenario
+    if GraphInstance.validator is None or GraphInstance.validator.context != context:
+        criteria = Scenario.criteria_maps[Scenario.latest].targets
+        GraphInstance.validator = ShapeValidator([URIRef(SC + 'c-' + criterion, SC) for criterion in criteria],
+                                                 context, URIRef(TOOL + Scenario.tool_version, TOOL))
+    return GraphInstance.validator
+
+
+def validate_assessment(ass_id: str, triples: list) -> list:
+    """
+    Validates the migrated triples of an individual assessment graph against the shape of the latest scenario.
+    :param ass_id: identifier of the assessment
+    :param triples: migrated triples
+    :return: list of issues, empty if the graph is valid
+    """
+    return shape_validator().validate(URIRef(CAMSSA + ass_id, CAMSSA), triples)
+
+
+def migrate_assessment(path: str, deterministic: bool = False, cache: ParseCache = None,
+                       metrics: bool = False, serialize: bool = True, data: bytes = None, write=None,
+                       output_format: str = 'turtle', compress: bool = False,
+                       validate: bool = False) -> MigrationResult:
+    """
+    Migrates an individual assessment graph end-to-end: reading, mapping of criteria, rewriting of the results
+    subgraph and serialisation. It runs either in the main process or in a worker process.
+    :param path: filepath of the individual assessment graph
+    :param deterministic: content-derived identifiers of the new scores and statements
+    :param cache: on-disk cache of parsed graphs, if any; by default, the one installed in this worker process
+    :param metrics: send the metrics recorded in this worker process back with the result
+    :param serialize: write the migrated graph to a Turtle file, unless the main process sends it to a sink
+    :param data: content of the file, when already read
+    :param write: function writing the serialised graph, instead of writing it here
+    :param output_format: format of the migrated graph, 'turtle' or 'nt'
+    :param compress: gzip-compress the migrated graph
+    :param validate: validate the migrated graph, and send the issues found back with the result
+    :return: the compact result of the migration
+    """
+    # individual assessment graph constructor
+    new_graph = GraphInstance(path, deterministic, cache or ParseCache.installed, data, output_format, compress)
+    # assessment id, scenario version, tool version
+    new_graph.set_ass_id()
+    new_graph.set_eif_version()
+    new_graph.tool_version = \
+    str(new_graph.g.value(URIRef(CAMSSA + new_graph.ass_id, CAMSSA), CAMSS.toolVersion, any=None)).split("#")[-1]
+    print(f"Extracting and initialising migration of the {new_graph.ttl_filename} "
+          f"CAMSS Assessment EIF {new_graph.tool_version}")
+    # updating of the individual assessment graph
+    new_graph.overwrite_graph()
+    # initialise list of new responses
+    new_graph.responses_new = [0, 0, 0, 0]
+    # updating RDF file
+    new_graph.populate_dict_responses()
+    # old scores generation
+    # conditional unused in migration from 5.1.0 to 6.0.0.
+    if new_graph.tool_version != '5.0.0':
+        new_graph.set_old_scores()
+    else:
+        new_graph.scores = ['Undefined'] * 2
+    # removal and addition of subgraph
+    new_graph.remove_old_subgraph()
+    new_graph.add_results_subgraph()
+    # bind namespaces
+    new_graph.bind_graph()
+    # serialisation of the updated individual assessment graph
+    if serialize:
+        new_graph.serialize(write)
+    # new scores generation - conditional unused in migration from 5.1.0 to 6.0.0.
+    if new_graph.tool_version != '5.0.0':
+        new_graph.set_new_scores()
+    else:
+        new_graph.scores += ['Undefined'] * 2
+        #new_graph.responses_new[0] = new_graph.responses.count(NOT_ANSWERED)
+        new_graph.responses_new[0] = 'Undefined'
+        new_graph.responses_new[2] = new_graph.responses.count(NO)
+        new_graph.responses_new[1] = 'Undefined'
+        new_graph.responses_new[3] = 'Undefined'
+    new_graph.scores.append(new_graph.tool_version)
+    triples = list(new_graph.g)
+    return MigrationResult(path, new_graph.get_destination() if serialize else None, new_graph.ass_id,
+                           new_graph.ttl_filename, new_graph.tool_version, new_graph.scores, new_graph.responses_new,
+                           triples, Metrics.installed.drain() if metrics and Metrics.installed else None,
+                           new_graph.issues + validate_assessment(new_graph.ass_id, triples) if validate else None)
+
+
+def try_migrate_assessment(path: str, **options) -> MigrationResult:
+    """
+    Migrates an individual assessment graph, isolating its failure: the error is returned in the result instead of
+    being raised, so that a malformed input does not stop the migration of the other assessments.
+    :param path: filepath of the individual assessment graph
+    :param options: options of migrate_assessment
+    :return: the compact result of the migration, or of its failure
+    """
+    try:
+        return migrate_assessment(path, **options)
+    except Exception as e:
+        error = utils.format_error(e)
+        print(f"       Migration of {path} FAILED: {error}")
+        return MigrationResult(path, None, None, utils.set_name(os.path.splitext(path)[0].split("/")[-1]), None,
+                               None, None, error=error,
+                               metrics=Metrics.installed.drain() if options.get('metrics') and Metrics.installed
+                               else None)
+
+
+def main(workers: int = 1, incremental: bool = False, deterministic: bool = False, streaming: bool = False,
+         tables: list = None, cache: bool = False, report_format: str = 'csv', report_append: bool = False,
+         metrics: str = None, profile: str = None, sink: str = 'files', endpoint: str = None, pipeline: int = 0,
+         output_format: str = 'turtle', compress: bool = False, validate: bool = False, resume: bool = False,
+         shards: int = 0) -> dict:
     """
     Main function.
+    :param workers: number of worker processes migrating individual assessment graphs; 1 runs them in this process
+    :param incremental: reuse the assessments whose input graph and migration table are unchanged since the
+    previous run, and only patch the assessments graph for the assessments that changed
+    :param deterministic: content-derived identifiers of the new scores and statements, so that identical inputs
+    give identical outputs
+    :param streaming: write the assessments graph as N-Triples while the assessments are migrated, instead of
+    merging them into the assessments graph in memory
+    :param tables: further migration tables (filepath, source scenario, target scenario), chained with the default
+    one so that older assessments are migrated to the latest scenario in a single pass
+    :param cache: load the input graphs from the parse cache in 'arti/cache/' instead of parsing them, when cached
+    :param report_format: format of the table of scores in 'arti/punct/': 'csv', 'jsonl' or 'parquet'
+    :param report_append: write the table of scores row by row while the assessments are migrated
+    :param metrics: write per-stage metrics to 'arti/out/' as 'json' or 'prometheus' text
+    :param profile: write a profile of the run to 'arti/out/' by 'cprofile' or 'pyinstrument'
+    :param sink: destination of the migrated individual assessment graphs: Turtle 'files' in 'arti/out/', an
+    in-process 'dataset' written as TriG, or a triplestore loaded with 'sparql-update' or 'gsp' requests
+    :param endpoint: URL of the triplestore
+    :param pipeline: overlap reading, migrating and writing the individual assessment graphs, with at most this
+    number of graphs waiting between two stages; 0 runs the stages one after the other
+    :param output_format: format of the migrated graphs in 'arti/out/', 'turtle' or 'nt'
+    :param compress: gzip-compress the migrated graphs in 'arti/out/'
+    :param validate: validate the migrated graphs and write the issues found to 'arti/punct/'; issues do not stop
+    the migration
+    :param resume: reuse the assessments completed by an interrupted run, as recorded in its journal
+    :param shards: write the assessments graph as this number of N-Triples shards, with an index of the shard and
+    byte offset of each assessment, instead of a single file
+    :return: error per failed input file; failed assessments keep their previous results in the assessments graph
     """
+    if shards and streaming:
+        raise ValueError("The streaming assembly writes a single file and cannot be sharded")
+    # the methods of the graph instances are only instrumented when metrics are enabled
+    run_metrics = Metrics(metrics, profile)
+    run_metrics.install(GraphInstance)
+    register_tables(tables or [])
+    graph_sink = open_sink(sink, endpoint)
     # input folder of the individual assessment graphs and the assessments graph
     input_folder = 'arti/in'
     # output folder of all updated graphs
     os.makedirs('arti/out/', exist_ok=True)
     list_ass_names = [path for path in glob.iglob(input_folder + '/**.ttl', recursive=False) if
                       path != input_folder + "/AssessmentsG"]
+    ass_graph_path = glob.glob(input_folder + '/AssessmentsG' + '/*')[0]
+    # manifest of the previous run, and hashes of the migration table and of the input graphs
+    manifest = Manifest()
+    table_hash = tables_hash(Scenario.tables)
+    input_hashes = {path: file_hash(path) for path in list_ass_names + [ass_graph_path]}
+    removed = manifest.discard(set(input_hashes))
+    # the cache keys of the input graphs are their hashes, which are not computed again
+    parse_cache = ParseCache(hashes=input_hashes) if cache else None
+    # options of the migration that change the outputs
+    output_options = dict(deterministic=deterministic, output_format=output_format, compress=compress)
+    # checkpoint journal, and the assessments completed by the interrupted run when resuming
+    journal = Journal(resume=resume)
+    resumed = {path for path in journal.entries if path in input_hashes}
+    manifest.entries.update({path: journal.entries[path] for path in resumed})
+    if journal.failures:
+        print(f"Retrying {len(journal.failures)} inputs that failed in the interrupted run")
+    # only Turtle files are reused
+    fresh = {path for path in list_ass_names if (incremental or path in resumed) and not graph_sink and
+             manifest.is_fresh(path, input_hashes[path], table_hash, **output_options)}
+    changed = [path for path in list_ass_names if path not in fresh]
+    # the previous assessments graph is patched only if its input graph is unchanged and no assessment was removed;
+    # assessments resumed from the journal are not in it yet
+    # sharding only changes the output of the assessments graph, and entries without shards match no sharding
+    patch = incremental and not removed and manifest.is_fresh(ass_graph_path, input_hashes[ass_graph_path],
+                                                              table_hash, **output_options, shards=shards or None)
+    assemble = not (patch and not changed and not resumed)
+    run_metrics.lap('setup', read=list(input_hashes))
+    # CAMSS Assessment graph constructor
+    if assemble:
+        # the previous output is not an input, so it is not cached
+        final_ass_graph = GraphInstance(manifest.entries[ass_graph_path]['output'] if patch else ass_graph_path,
+                                        cache=None if patch else parse_cache, output_format=output_format,
+                                        compress=compress, shards=shards)
+        assembly = StreamingAssembly(final_ass_graph.g) if streaming else None
+        run_metrics.lap('load')
     list_ass = []
-    # this loop works on all individual assessment files
-    # that is, ttl files of the individual assessment graphs and assessments graph
+    failures = {}
+    # old and new scores, and number of not answered, n/a, no, yes responses per assessment
+    report = ScoresReport(report_format=report_format, append=report_append)
+    validation = ValidationReport() if validate else None
+    # this loop works on all changed individual assessment files, either here or in a pool of worker processes
+    # worker processes get the cache, with the hashes of all the inputs, once instead of with each task
+    migrate = partial(try_migrate_assessment, deterministic=deterministic, cache=None if workers > 1 else parse_cache,
+                      output_format=output_format, compress=compress, validate=validate,
+                      metrics=workers > 1 and run_metrics.enabled, serialize=not graph_sink)
+    executor = None
+    if workers > 1:
+        # imported here, as multiprocessing is not needed when migrating in this process
+        from concurrent.futures import ProcessPoolExecutor
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                                       initargs=(Scenario.tables, run_metrics.enabled, parse_cache))
+    stages = Pipeline(pipeline) if pipeline > 0 else None
+    if stages:
+        results = stages.run(changed, migrate, executor)
+    else:
+        results = executor.map(migrate, changed) if executor else map(migrate, changed)
     for path in list_ass_names:
-        # individual assessment graph constructor
-        # assessment graph constructor
-        new_graph = GraphInstance(path)
-        # output folder of the updated individual assessment graph
-        new_dir = 'arti/out/'
-        os.makedirs(new_dir, exist_ok=True)
-        # assessment id, scenario version, tool version
-        new_graph.set_ass_id()
-        new_graph.set_eif_version()
-        new_graph.tool_version = \
-        str(new_graph.g.value(URIRef(CAMSSA + new_graph.ass_id, CAMSSA), CAMSS.toolVersion, any=None)).split("#")[-1]
-        print(f"Extracting and initialising migration of the {new_graph.ttl_filename} "
-              f"CAMSS Assessment EIF {new_graph.tool_version}")
-        # updating of the individual assessment graph and the assessments graph
-        new_graph.overwrite_graph()
-        # initialise list of new responses
-        new_graph.responses_new = [0, 0, 0, 0]
-        # updating RDF file
-        new_graph.populate_dict_responses()
-        # old scores generation
-        # conditional unused in migration from 5.1.0 to 6.0.0.
-        if new_graph.tool_version != '5.0.0':
-            new_graph.set_old_scores()
-        else:
-            new_graph.g_scores[new_graph.ttl_filename] = ['Undefined'] * 2
-        # removal and addition of subgraph
-        new_graph.remove_old_subgraph()
-        new_graph.add_results_subgraph()
-        # bind namespaces
-        new_graph.bind_graph()
-        list_ass.append(new_graph)
-        # serialisation of the updated individual assessment graph
-        new_graph.serialize()
-        # new scores generation - conditional unused in migration from 5.1.0 to 6.0.0.
-        if new_graph.tool_version != '5.0.0':
-            new_graph.set_new_scores()
+        if path in fresh:
+            entry = manifest.entries[path]
+            result = MigrationResult(path, entry['output'], entry['ass_id'], entry['ttl_filename'],
+                                     entry['tool_version'], entry['scores'], entry['responses_new'],
+                                     issues=entry.get('issues'))
+            print(f"Reusing the migration of the {result.ttl_filename} CAMSS Assessment")
         else:
-            new_graph.g_scores[new_graph.ttl_filename] += ['Undefined'] * 2
-            #new_graph.responses_new[0] = sum([1 for i in new_graph.dict_responses['answer'] if i == 'Not Answered'])
-            new_graph.responses_new[0] = 'Undefined'
-            new_graph.responses_new[2] = sum([1 for i in new_graph.dict_responses['answer'] if i == 'No/Gradient'])
-            new_graph.responses_new[1] = 'Undefined'
-            new_graph.responses_new[3] = 'Undefined'
-        # create csv with scores
-        new_graph.responses_new_df[new_graph.ttl_filename] = new_graph.responses_new
-        new_graph.g_scores[new_graph.ttl_filename].append(new_graph.tool_version)
-        utils.get_punct(new_graph.g_scores, new_graph.responses_new_df)
-    # CAMSS Assessment graph constructor
-    final_ass_graph = GraphInstance(glob.glob(input_folder + '/AssessmentsG' + '/*')[0])
-    print(f"Extracting and initialising migration of the {final_ass_graph.ttl_filename} dataset")
-    print("       Migration IN PROGRESS")
-    print("")
-    for ass in list_ass:
-        final_ass_graph.eif_version = ass.sc600_id
-        final_ass_graph.ass_id = ass.ass_id
-        final_ass_graph.overwrite_graph()
-        final_ass_graph.remove_old_subgraph()
-        final_ass_graph.g += ass.g
-        print(f"       Migration of {ass.ttl_filename} COMPLETED")
+            result = next(results)
+            run_metrics.merge(result.metrics)
+            # one named graph per assessment
+            if graph_sink and not result.error:
+                try:
+                    result.output = graph_sink.write(URIRef(CAMSSA + result.ass_id, CAMSSA), result.triples)
+                except (ValueError, ConnectionError) as e:
+                    result.error = utils.format_error(e)
+            # failed migrations, and migrated graphs that the pipeline failed to write
+            if result.error:
+                failures[path] = result.error
+                manifest.entries.pop(path, None)
+                journal.fail(path, result.error)
+                continue
+            # results come once their output is written, also from the writer thread of the pipeline, so the journal
+            # only records assessments whose file is complete
+            manifest.update(path, input_hashes[path], table_hash, result.output, **output_options,
+                            **result.to_dict())
+            journal.record(path, manifest.entries[path])
+        if validation:
+            # reused migrations are validated again only if they were not validated when they were migrated
+            if result.issues is None:
+                result.issues = manifest.entries[path]['issues'] = validate_assessment(result.ass_id,
+                                                                                       result.load_triples())
+            validation.add(result.ttl_filename, result.ass_id, result.issues)
+        # the assessments graph takes every assessment, or only the changed and resumed ones when it is patched
+        if assemble and not (patch and path in fresh and path not in resumed):
+            if assembly:
+                assembly.add(result.ass_id, result.load_triples())
+                result.triples = None
+            list_ass.append(result)
+        report.add(result.ttl_filename, result.scores, result.responses_new)
+    if stages:
+        stages.close()
+    if executor:
+        executor.shutdown()
+    if graph_sink:
+        graph_sink.close()
+    run_metrics.lap('migration')
+    # create table with scores
+    written = [report.close()]
+    if validation:
+        written.append(validation.close())
+        print(f"{len(validation.rows)} validation issues, see {written[-1]}")
+    run_metrics.lap('report', written=written)
+    if not assemble:
+        print("The CAMSS Assessments graph is up to date")
+    else:
+        print(f"Extracting and initialising migration of the {final_ass_graph.ttl_filename} dataset")
+        print("       Migration IN PROGRESS")
         print("")
+        if not assembly:
+            final_ass_graph.merge_results(list_ass)
+        for ass in list_ass:
+            print(f"       Migration of {ass.ttl_filename} COMPLETED")
+            print("")
 
-    # output folder of the assessments graph
-    # serialisation of the updated assessments graph
-    final_ass_graph.serialize()
+        # output folder of the assessments graph
+        # serialisation of the updated assessments graph
+        if assembly:
+            destination = assembly.close()
+        else:
+            final_ass_graph.serialize()
+            destination = final_ass_graph.get_destination()
+        manifest.update(ass_graph_path, input_hashes[ass_graph_path], table_hash, destination,
+                        **output_options, shards=shards or None)
+        run_metrics.lap('assembly', written=[destination])
+    manifest.save()
+    journal.close()
+    if parse_cache:
+        # only the current input graphs are kept in the cache
+        parse_cache.prune(input_hashes.values())
+    run_metrics.lap('manifest', written=[manifest.path])
+    run_metrics.close()
     print("")
     print("")
     print("You may find the CAMSS Assessments graph in the 'out/CAMSS_Assessments_graph' folder")
+    if failures:
+        print("")
+        print(f"{len(failures)} of {len(list_ass_names)} CAMSS Assessments FAILED:")
+        for path, error in failures.items():
+            print(f"       {path}: {error}")
+    return failures
+
+
+def parse_args(argv: list = None) -> argparse.Namespace:
+    """
+    Parses the command-line options of the migration.
+    :param argv: list of command-line arguments, sys.argv by default
+    :return: the parsed options
+    """
+    parser = argparse.ArgumentParser(description='Migrates CAMSS Assessments EIF Scenario graphs to version 6.0.0.')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='number of worker processes migrating individual assessments (default: 1)')
+    parser.add_argument('--incremental', action='store_true',
+                        help='reuse the assessments that are unchanged since the previous run')
+    parser.add_argument('--deterministic', action='store_true',
+                        help='derive the identifiers of new scores and statements from their content')
+    parser.add_argument('--streaming', action='store_true',
+                        help='write the CAMSS Assessments graph as N-Triples while the assessments are migrated')
+    parser.add_argument('--table', nargs=3, action='append', dest='tables', metavar=('PATH', 'SOURCE', 'TARGET'),
+                        help='further migration table from a source to a target scenario identifier (repeatable)')
+    parser.add_argument('--cache', action='store_true',
+                        help="load parsed input graphs from the cache in 'arti/cache/' when possible")
+    parser.add_argument('--report-format', choices=FORMATS, default='csv',
+                        help="format of the table of scores in 'arti/punct/' (default: csv)")
+    parser.add_argument('--report-append', action='store_true',
+                        help='write the table of scores row by row while the assessments are migrated')
+    parser.add_argument('--metrics', choices=METRICS_FORMATS,
+                        help="write per-stage timings, triple counts and bytes read and written to 'arti/out/'")
+    parser.add_argument('--profile', choices=PROFILERS,
+                        help="write a profile of the run to 'arti/out/' (pyinstrument must be installed)")
+    parser.add_argument('--sink', choices=SINKS, default='files',
+                        help='destination of the migrated individual assessments, one named graph per assessment '
+                             'unless files (default: files)')
+    parser.add_argument('--pipeline', type=int, default=0, metavar='DEPTH',
+                        help='overlap reading, migrating and writing the individual assessments, with at most DEPTH '
+                             'assessments waiting between two stages (default: 0, off)')
+    parser.add_argument('--output-format', choices=list(OUTPUT_FORMATS), default='turtle',
+                        help="format of the migrated graphs in 'arti/out/' (default: turtle)")
+    parser.add_argument('--gzip', action='store_true', dest='compress',
+                        help="gzip-compress the migrated graphs in 'arti/out/'")
+    parser.add_argument('--validate', action='store_true',
+                        help="validate the migrated graphs and write the issues found to 'arti/punct/'")
+    parser.add_argument('--resume', action='store_true',
+                        help="reuse the assessments completed by an interrupted run, from 'arti/out/journal.jsonl'")
+    parser.add_argument('--shards', type=int, default=0, metavar='N',
+                        help="write the CAMSS Assessments graph as N N-Triples shards with an index of the assessments")
+    parser.add_argument('--endpoint',
+                        help='URL of the SPARQL Update endpoint or Graph Store Protocol service of the triplestore')
+    return parser.parse_args(argv)
 
 
 # main function
 if __name__ == '__main__':
-    main()
+    sys.exit(1 if main(**vars(parse_args())) else 0)
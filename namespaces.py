@@ -0,0 +1,11 @@
+from rdflib import Namespace
+
+# assessment(s) graph namespaces, apart from RDF, OWL and XSD
+CAMSS = Namespace("http://data.europa.eu/2sa#")
+CAMSSA = Namespace("http://data.europa.eu/2sa/assessments/")
+CAV = Namespace("http://data.europa.eu/2sa/cav#")
+CSSV_RSC = Namespace("http://data.europa.eu/2sa/cssv/rsc/")
+SC = Namespace("http://data.europa.eu/2sa/scenarios#")
+SCHEMA = Namespace("http://schema.org/")
+STATUS = Namespace("http://data.europa.eu/2sa/rsc/assessment-status#")
+TOOL = Namespace("http://data.europa.eu/2sa/rsc/toolkit-version#")
@@ -0,0 +1,117 @@
+import os
+import glob
+import gzip
+import pandas as pd
+from IPython.core.display import display, HTML
+from IPython.display import Javascript, display
+import ipywidgets as widgets
+from manifest import Manifest
+from shards import read_block, load_index
+
+
+def migrated_outputs() -> tuple:
+    """
+    Provides the migrated graphs of the last run from its manifest, whatever their format, compression or sharding,
+    or the Turtle files in 'arti/out/' when there is no manifest, e.g. the outputs shipped with the tool.
+    :return: filepaths of the individual assessment graphs, and filepath of the assessments graph or of its index
+    """
+    outputs = sorted(entry['output'] for entry in Manifest().entries.values()
+                     if entry['output'] and os.path.exists(entry['output']))
+    ass_graph = [path for path in outputs if os.path.basename(os.path.dirname(path)) == 'CAMSS_Assessments_graph']
+    if not ass_graph:
+        return sorted(glob.glob('arti/out/*.ttl')), 'arti/out/CAMSS_Assessments_graph/CAMSS_Assessments_graph.ttl'
+    return [path for path in outputs if path not in ass_graph], ass_graph[0]
+
+
+def print_graph(path: str):
+    """
+    Prints a migrated graph file, possibly gzip-compressed.
+    :param path: filepath of the graph
+    """
+    with (gzip.open(path, 'rt', encoding='utf-8') if path.endswith('.gz') else open(path, 'r')) as f:
+        for line in f:
+            print(line, end='')
+
+def read_files():
+    """
+    (Jupyter Notebook) Reads an arbitraty RDF file after the migration.
+    """
+    print_graph(migrated_outputs()[0][0])
+
+def read_assessments_graph():
+    """
+    (Jupyter Notebook) Reads the CAMSS Assessments graph RDF file after the migration, or its shards after the
+    migration with '--shards'.
+    """
+    path = migrated_outputs()[1]
+    if not path.endswith('.json'):
+        print_graph(path)
+        return
+    for name in sorted(load_index(path)['files']):
+        print_graph(os.path.join(os.path.dirname(path), name))
+
+def read_assessment(ass_id: str):
+    """
+    (Jupyter Notebook) Reads a single assessment of the sharded CAMSS Assessments graph after the migration with
+    '--shards', with one seek in its shard.
+    :param ass_id: identifier of the assessment
+    """
+    path = migrated_outputs()[1]
+    if not path.endswith('.json'):
+        raise ValueError("The CAMSS Assessments graph is not sharded, run the migration with '--shards'")
+    print(read_block(ass_id, path).decode('utf-8'), end='')
+
+def read_punct():
+    """
+    (Jupyter Notebook) Reads the table of the migration results.
+    :return: such table
+    """
+    #df = pd.read_csv('arti/punct/EIFScenario510-scoresComparison.csv')
+    df = pd.read_excel('arti/punct/EIFScenario510-scoresComparation.xlsx')
+    df.rename(columns={'Unnamed: 0': 'Specification'}, inplace=True)
+    pd.options.display.max_rows = None
+    return df
+
+###########################################
+############ Hide code ####################
+###########################################
+
+# source: https://www.titanwolf.org/Network/q/8f9729f8-fc73-4bc7-97b8-dcb9604a9356/y
+
+javascript_functions = {False: "hide()", True: "show()"}
+button_descriptions  = {False: "Show code", True: "Hide code"}
+
+
+def toggle_code(state):
+
+    """
+    Toggles the JavaScript show()/hide() function on the div.input element.
+    """
+
+    output_string = "<script>$(\"div.input\").{}</script>"
+    output_args   = (javascript_functions[state],)
+    output        = output_string.format(*output_args)
+
+    display(HTML(output))
+
+
+def button_action(value):
+
+    """
+    Calls the toggle_code function and updates the button description.
+    """
+
+    state = value.new
+
+    toggle_code(state)
+
+    value.owner.description = button_descriptions[state]
+
+def display_hidebuttom():
+    state = False
+    toggle_code(state)
+
+    button = widgets.ToggleButton(state, description = button_descriptions[state])
+    button.observe(button_action, "value")
+
+    display(button)
\ No newline at end of file
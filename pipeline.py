@@ -0,0 +1,165 @@
+import os
+import queue
+import threading
+from collections import deque
+from utils import format_error
+from writer import write_file
+
+# end of the items of a queue
+DONE = object()
+
+
+class Pipeline:
+    """
+    Pipelined migration of the individual assessment graphs: a reader thread reads the input files, the migration
+    transforms them, either in this thread or in worker processes, and a writer thread writes the serialised
+    graphs, so that reading, transforming and writing overlap. The stages are connected by bounded queues, and at
+    most 'depth' graphs wait between two stages, so memory stays bounded and a slow stage holds back the others.
+    Worker processes write their own outputs. Results are provided in the order of the input files, and only once
+    their output is written, so that a result recorded by the caller always has its file; a graph that cannot be
+    written fails its result alone.
+    """
+    depth: int
+    written: dict  # event per destination queued to the writer stage, set once it is written
+    errors: dict  # error per destination that the writer stage failed to write
+
+    def __init__(self, depth: int = 4):
+        """
+        :param depth: maximum number of graphs waiting between two stages
+        """
+        self.depth = depth
+        self.inputs = queue.Queue(maxsize=depth)
+        self.outputs = queue.Queue(maxsize=depth)
+        self.written = {}
+        self.errors = {}
+        self.stopped = threading.Event()
+        self.writer = None
+        return
+
+    def put(self, items: queue.Queue, item) -> bool:
+        """
+        Puts an item in a queue, waiting for room unless the pipeline is stopped.
+        :param items: queue
+        :param item: item
+        :return: False if the pipeline was stopped before the item was put
+        """
+        while not self.stopped.is_set():
+            try:
+                items.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def read(self, paths: list):
+        """
+        Reader stage: reads the input files. A file that cannot be read is passed on without its content, so that
+        the transform stage reads it again and fails on it alone.
+        :param paths: filepaths of the input graphs
+        :return: files read
+        """
+        for path in paths:
+            try:
+                with open(path, 'rb') as f:
+                    data = f.read()
+            except OSError:
+                data = None
+            if not self.put(self.inputs, (path, data)):
+                return
+        self.put(self.inputs, DONE)
+        return
+
+    def write_files(self):
+        """
+        Writer stage: writes the serialised graphs, each to a temporary file moved in place once complete, so that
+        an interrupted run leaves no partial graph. A graph that cannot be written does not stop the others.
+        :return: files written
+        """
+        while True:
+            item = self.outputs.get()
+            if item is DONE:
+                return
+            destination, data, written = item
+            try:
+                os.makedirs(os.path.dirname(destination), exist_ok=True)
+                write_file(destination, data)
+            except OSError as e:
+                self.errors[destination] = e
+            finally:
+                written.set()
+
+    def write(self, destination: str, data: bytes):
+        """
+        Passes a serialised graph to the writer stage, waiting for room in the queue.
+        :param destination: filepath of the graph
+        :param data: serialised graph
+        :return: graph queued
+        """
+        self.written[destination] = threading.Event()
+        self.outputs.put((destination, data, self.written[destination]))
+        return
+
+    def finish(self, item):
+        """
+        Provides a result once its output is written: waits for the migration in a worker process, which writes its
+        own output, or for the writer stage to write the graph migrated in this thread.
+        :param item: result, or future result of a worker process
+        :return: the result, with the error of its write if the writer stage failed to write it
+        """
+        result = item.result() if hasattr(item, 'result') else item
+        written = self.written.pop(result.output, None)
+        if written is not None:
+            written.wait()
+            error = self.errors.pop(result.output, None)
+            if error is not None:
+                result.error = format_error(error)
+        return result
+
+    def run(self, paths: list, migrate, executor=None):
+        """
+        Runs the pipeline.
+        :param paths: filepaths of the input graphs
+        :param migrate: function migrating an input graph, given its filepath, its content and, in this process,
+        the function writing its output
+        :param executor: pool of worker processes, if any
+        :return: generator of the results of the migration, in the order of the input files
+        """
+        reader = threading.Thread(target=self.read, args=(paths,), daemon=True)
+        self.writer = threading.Thread(target=self.write_files, daemon=True)
+        reader.start()
+        self.writer.start()
+        pending = deque()
+        try:
+            while True:
+                item = self.inputs.get()
+                if item is DONE:
+                    break
+                path, data = item
+                if executor:
+                    pending.append(executor.submit(migrate, path, data=data))
+                else:
+                    pending.append(migrate(path, data=data, write=self.write))
+                if len(pending) >= self.depth:
+                    yield self.finish(pending.popleft())
+            while pending:
+                yield self.finish(pending.popleft())
+        finally:
+            if executor:
+                for future in pending:
+                    future.cancel()
+            self.close()
+        return
+
+    def close(self):
+        """
+        Stops the reader stage and waits until the writer stage has written all the graphs. The main process
+        closes the pipeline once it has all the results, as it does not exhaust the generator of results. Errors of
+        the writer stage are reported on their results, not raised here.
+        :return: pipeline closed
+        """
+        self.stopped.set()
+        if self.writer is not None:
+            self.outputs.put(DONE)
+            self.writer.join()
+            self.writer = None
+        return
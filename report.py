@@ -0,0 +1,110 @@
+import os
+import csv
+import json
+
+# columns of the table of the migration results, after the name of the assessment
+COLUMNS = ['Previous EIF', 'old AUT score (%)', 'new AUT score (%)', 'old STRENG score (%)', 'new STRENG score (%)',
+           'Not Answer (#)', 'Not Applicable (#)', 'No/Gradient', 'Yes/Gradient (#)']
+FORMATS = ['csv', 'jsonl', 'parquet']
+
+
+def score_row(name: str, scores: list, responses_new: list) -> list:
+    """
+    Provides the row of the table of the migration results of an assessment.
+    :param name: name of the assessment
+    :param scores: old and new automated and strength scores, and previous EIF version
+    :param responses_new: number of not answered, n/a, no, yes responses
+    :return: row of the table
+    """
+    return [name, scores[4], scores[0], scores[2], scores[1], scores[3]] + list(responses_new)
+
+
+class ScoresReport:
+    """
+    Table of the migration results, i.e. the old and new scores and the number of not answered, n/a, no and yes
+    responses per assessment. Rows are collected while the assessments are migrated and the table is written once
+    at the end of the run or, in append mode, one row at a time as the assessments are migrated. Parquet output
+    requires pyarrow.
+    """
+    path: str
+    report_format: str
+    append: bool
+    rows: list
+
+    def __init__(self, path: str = 'arti/punct/EIFScenario510-scoresComparison', report_format: str = 'csv',
+                 append: bool = False):
+        """
+        :param path: filepath of the table, without extension
+        :param report_format: 'csv', 'jsonl' or 'parquet'
+        :param append: write each row as soon as it is added (csv and jsonl only)
+        """
+        if report_format not in FORMATS:
+            raise ValueError(f"Unknown format of the scores report: {report_format}")
+        if append and report_format == 'parquet':
+            raise ValueError("Parquet scores reports cannot be written in append mode")
+        if report_format == 'parquet':
+            # fails before the migration rather than after it when pyarrow is not installed
+            import pyarrow
+        self.path = f'{path}.{report_format}'
+        self.report_format = report_format
+        self.append = append
+        self.rows = []
+        self.out = None
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        if append:
+            self.out = open(self.path, 'w', newline='')
+            if report_format == 'csv':
+                csv.writer(self.out, lineterminator='\n').writerow([''] + COLUMNS)
+        return
+
+    def add(self, name: str, scores: list, responses_new: list):
+        """
+        Adds the results of an assessment.
+        :param name: name of the assessment
+        :param scores: old and new automated and strength scores, and previous EIF version
+        :param responses_new: number of not answered, n/a, no, yes responses
+        :return: row added
+        """
+        row = score_row(name, scores, responses_new)
+        self.rows.append(row)
+        if self.out:
+            self.write_rows([row], self.out)
+            self.out.flush()
+        return
+
+    def write_rows(self, rows: list, out):
+        """
+        Writes rows of the table in csv or JSON Lines format.
+        :param rows: rows of the table
+        :param out: text file
+        :return: rows written
+        """
+        if self.report_format == 'csv':
+            csv.writer(out, lineterminator='\n').writerows(rows)
+        else:
+            for row in rows:
+                out.write(json.dumps(dict(zip(['Specification'] + COLUMNS, row))) + '\n')
+        return
+
+    def close(self) -> str:
+        """
+        Writes the table, unless it has been written row by row.
+        :return: filepath of the table
+        """
+        if self.out:
+            self.out.close()
+        elif self.report_format == 'parquet':
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            columns = {}
+            for name, values in zip(['Specification'] + COLUMNS, zip(*self.rows) if self.rows else [()] * 10):
+                # 'Undefined' scores make a column textual
+                columns[name] = list(values) if all(isinstance(value, int) for value in values) \
+                    else [str(value) for value in values]
+            pq.write_table(pa.table(columns), self.path)
+        else:
+            with open(self.path, 'w', newline='') as out:
+                if self.report_format == 'csv':
+                    csv.writer(out, lineterminator='\n').writerow([''] + COLUMNS)
+                self.write_rows(self.rows, out)
+        return self.path
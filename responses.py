@@ -0,0 +1,134 @@
+from array import array
+
+# answer codes
+NONE, NOT_ANSWERED, NOT_APPLICABLE, NO, YES = range(5)
+ANSWERS = ['None', 'Not Answered', 'Not Applicable', 'No/Gradient', 'Yes/Gradient']
+# lexical forms of the known scores, indexed by score code, and their codes; the table is fixed, so that it is
+# shared by the tables of a process, also from several threads, and does not grow in long-lived processes
+SCORES = ['None', '0', '20', '40', '60', '80', '100']
+SCORE_CODES = {value: code for code, value in enumerate(SCORES)}
+
+
+def score_code(value: str):
+    """
+    Provides the code of a known score; other scores are kept as they are.
+    :param value: lexical form of the score, e.g. '20'
+    :return: score code, or the lexical form of an unknown score
+    """
+    return SCORE_CODES.get(value, value)
+
+
+def score_value(code) -> str:
+    """
+    :param code: score code, or lexical form of an unknown score
+    :return: lexical form of the score
+    """
+    return SCORES[code] if code.__class__ is int else code
+
+
+class ResponseTable:
+    """
+    Compact table of the responses of an assessment, one slot per criterion of the target scenario. Statements and
+    scores of criteria merged into the same slot are kept as vectors and only joined when the results subgraph is
+    written, known scores as codes and answers as codes in a typed array, so that counting answers is a single pass
+    in C.
+    """
+    __slots__ = ('criteria', 'statements', 'scores', 'old_scores', 'answers')
+    criteria: list  # target criterion per slot, None if not mapped
+    statements: list  # tuple of merged statements per slot
+    scores: list  # tuple of merged score codes, or lexical forms of unknown scores, per slot
+    old_scores: list  # tuple of score codes of the old scenario per slot
+    answers: array  # answer code per slot
+
+    def __init__(self, size: int):
+        """
+        :param size: number of criteria of the target scenario
+        """
+        self.criteria = [None] * size
+        self.statements = [()] * size
+        self.scores = [()] * size
+        self.old_scores = [()] * size
+        self.answers = array('b', bytes(size))
+        return
+
+    def __len__(self) -> int:
+        return len(self.answers)
+
+    def add(self, index: int, statement, score: str):
+        """
+        Merges a statement and a score into a slot.
+        :param index: slot
+        :param statement: statement of the old criterion
+        :param score: lexical form of the score of the old criterion
+        :return: slot updated
+        """
+        self.statements[index] += (statement,)
+        # a missing score, 'None', is replaced by the next score merged into the slot, as an empty slot is
+        if self.get_score(index) == 'None':
+            self.scores[index] = (score_code(score),)
+        else:
+            self.scores[index] += (score_code(score),)
+        return
+
+    def set(self, index: int, criterion: str, statement=None, score: str = None, answer: int = None):
+        """
+        Replaces the content of a slot.
+        :param index: slot
+        :param criterion: target criterion
+        :param statement: statement, None for no statement
+        :param score: lexical form of the score, None for no score
+        :param answer: answer code, None to keep the answer
+        :return: slot updated
+        """
+        self.criteria[index] = criterion
+        self.statements[index] = () if statement is None else (statement,)
+        self.scores[index] = () if score is None else (score_code(score),)
+        if answer is not None:
+            self.answers[index] = answer
+        return
+
+    def get_criterion(self, index: int) -> str:
+        """
+        :param index: slot
+        :return: target criterion, 'None' if not mapped
+        """
+        criterion = self.criteria[index]
+        return 'None' if criterion is None else criterion
+
+    def get_statement(self, index: int):
+        """
+        :param index: slot
+        :return: statements of the slot separated by blank lines, 'None' if there is none
+        """
+        statements = self.statements[index]
+        if not statements:
+            return 'None'
+        return statements[0] if len(statements) == 1 else "\n\n".join(map(str, statements))
+
+    def get_score(self, index: int) -> str:
+        """
+        :param index: slot
+        :return: scores of the slot joined by '+', 'None' if there is none
+        """
+        return "+".join(map(score_value, self.scores[index])) or 'None'
+
+    def get_old_score(self, index: int) -> str:
+        """
+        :param index: slot
+        :return: scores of the old scenario of the slot joined by '+', 'None' if there is none
+        """
+        return "+".join(map(score_value, self.old_scores[index])) or 'None'
+
+    def get_answer(self, index: int) -> str:
+        """
+        :param index: slot
+        :return: answer of the slot
+        """
+        return ANSWERS[self.answers[index]]
+
+    def count(self, answer: int) -> int:
+        """
+        :param answer: answer code
+        :return: number of slots with the answer
+        """
+        return self.answers.count(answer)
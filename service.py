@@ -0,0 +1,275 @@
+import os
+import sys
+import json
+import signal
+import argparse
+import threading
+from contextlib import redirect_stdout
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from migration import Scenario, init_worker, register_tables, shape_validator, try_migrate_assessment
+from report import COLUMNS, score_row
+from writer import FORMATS
+
+
+def warm_up(tables: list, quiet: bool = False):
+    """
+    Initialises a process of the service: registers the migration tables, composes the criteria maps and compiles
+    the validator once, so that requests only parse, migrate and serialise their assessment.
+    :param tables: filepath, source scenario identifier and target scenario identifier of each migration table
+    :param quiet: send the messages of the migration to the standard error, e.g. in worker processes, as the
+    standard output may carry the responses
+    """
+    if quiet:
+        sys.stdout = sys.stderr
+    init_worker(tables)
+    if not Scenario.criteria_maps:
+        Scenario()
+    shape_validator()
+    return
+
+
+def resolve_path(path: str, input_dir: str) -> str:
+    """
+    Resolves the filepath of a request, following symbolic links, and checks that it is a file of the input folder
+    of the service, so that clients cannot have other files read.
+    :param path: filepath of the request
+    :param input_dir: input folder of the service
+    :return: the resolved filepath, or None if it is not a file of the input folder
+    """
+    folder = os.path.realpath(input_dir)
+    path = os.path.realpath(path)
+    if os.path.commonpath([folder, path]) != folder or not os.path.isfile(path):
+        return None
+    return path
+
+
+def migrate_request(request: dict, deterministic: bool = False, validate: bool = False) -> dict:
+    """
+    Migrates the assessment of a request, either in the process of the service or in a worker process.
+    :param request: either the 'path' of a 5.1.0 assessment or its 'turtle' content, with its 'name', and
+    optionally the 'format' of the migrated graph, 'turtle' (default) or 'nt'
+    :param deterministic: content-derived identifiers of the new scores and statements
+    :param validate: validate the migrated graph and return the issues found
+    :return: the migrated graph, the identifier and name of the assessment and its row of the table of scores, or
+    the error
+    """
+    if ('path' in request) == ('turtle' in request):
+        return {'error': "The request needs either the 'path' or the 'turtle' of an assessment"}
+    output_format = request.get('format', 'turtle')
+    if output_format not in FORMATS:
+        return {'error': f"Unknown format of the migrated graph: {output_format}"}
+    if 'path' in request:
+        path, data = request['path'], None
+    else:
+        # the name of the assessment is taken from the filepath, which is not read
+        path, data = os.path.basename(request.get('name', 'submission')) + '.ttl', request['turtle'].encode('utf-8')
+    graphs = []
+    result = try_migrate_assessment(path, deterministic=deterministic, data=data, output_format=output_format,
+                                    validate=validate, write=lambda destination, graph: graphs.append(graph))
+    if result.error:
+        # the error of the parser may quote the content of the file, so only its type is returned
+        return {'error': f"The assessment could not be migrated ({result.error.split(':')[0]})"}
+    response = {'ass_id': result.ass_id, 'name': result.ttl_filename, 'graph': graphs[0].decode('utf-8'),
+                'scores': dict(zip(['Specification'] + COLUMNS,
+                                   score_row(result.ttl_filename, result.scores, result.responses_new)))}
+    if validate:
+        response['issues'] = result.issues
+    return response
+
+
+class MigrationService:
+    """
+    Long-lived migration service of individual assessments, submitted one at a time, e.g. by a web front end. The
+    criteria maps and the validator are loaded once per process, and requests are migrated in this process or, to
+    serve concurrent requests, in a pool of warm worker processes. Requests are either JSON Lines on the standard
+    input, answered on the standard output as they complete, or JSON POST requests to '/migrate' over HTTP. Only
+    the files of the input folder can be requested by their path. Nothing is written to 'arti/out/'.
+    """
+    workers: int
+    deterministic: bool
+    validate: bool
+    input_dir: str  # folder of the files that can be requested by their path
+
+    def __init__(self, workers: int = 1, deterministic: bool = False, validate: bool = False, tables: list = None,
+                 input_dir: str = 'arti/in'):
+        """
+        :param workers: number of worker processes migrating the requests; 1 migrates them in this process
+        :param deterministic: content-derived identifiers of the new scores and statements
+        :param validate: validate the migrated graphs and return the issues found
+        :param tables: further migration tables (filepath, source scenario, target scenario)
+        :param input_dir: folder of the files that can be requested by their path
+        """
+        self.workers = workers
+        self.deterministic = deterministic
+        self.validate = validate
+        self.input_dir = input_dir
+        register_tables(tables or [])
+        warm_up(Scenario.tables)
+        self.executor = None
+        if workers > 1:
+            self.executor = ProcessPoolExecutor(max_workers=workers, initializer=warm_up,
+                                                initargs=(Scenario.tables, True))
+            # starts the worker processes before the first requests
+            list(self.executor.map(abs, range(workers)))
+        return
+
+    def handle(self, request: dict) -> dict:
+        """
+        Answers a request, waiting for its migration.
+        :param request: request, with an optional 'id' returned in the response
+        :return: response
+        """
+        if 'path' in request:
+            # only the files of the input folder are read
+            request = dict(request, path=resolve_path(str(request['path']), self.input_dir))
+        try:
+            if 'path' in request and request['path'] is None:
+                response = {'error': "The 'path' of the request is not a file of the input folder of the service"}
+            elif self.executor:
+                response = self.executor.submit(migrate_request, request, self.deterministic, self.validate).result()
+            else:
+                response = migrate_request(request, self.deterministic, self.validate)
+        except Exception as e:
+            # the details of unexpected errors are only logged
+            print(f"Request failed: {type(e).__name__}: {e}", file=sys.stderr)
+            response = {'error': "The request could not be served"}
+        if 'id' in request:
+            response['id'] = request['id']
+        return response
+
+    def serve_lines(self, lines=None, out=None):
+        """
+        Serves JSON Lines requests until the end of the input. Responses are written as soon as their request is
+        migrated, so they may come in another order than the requests when there are several workers.
+        :param lines: input of the requests, the standard input by default
+        :param out: output of the responses, the standard output by default
+        :return: requests served
+        """
+        lines = lines or sys.stdin
+        out = out or sys.stdout
+        lock = threading.Lock()
+
+        def answer(line: str):
+            try:
+                request = json.loads(line)
+            except ValueError as e:
+                request = {}
+                response = {'error': f"Invalid JSON request: {e}"}
+            else:
+                response = self.handle(request) if isinstance(request, dict) else \
+                    {'error': "The request must be a JSON object"}
+            with lock:
+                out.write(json.dumps(response) + '\n')
+                out.flush()
+
+        # messages of the migrations in this process must not mix with the responses
+        with redirect_stdout(sys.stderr), ThreadPoolExecutor(max_workers=self.workers) as pool:
+            for line in lines:
+                if line.strip():
+                    pool.submit(answer, line)
+        return
+
+    def serve_http(self, host: str = '127.0.0.1', port: int = 8000):
+        """
+        Serves HTTP requests until interrupted, one thread per connection.
+        :param host: address the service listens on
+        :param port: port the service listens on
+        :return: service stopped
+        """
+        server = ThreadingHTTPServer((host, port), RequestHandler)
+        server.service = self
+        print(f"Serving migrations on http://{host}:{server.server_port}/migrate", file=sys.stderr)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+        return
+
+    def close(self):
+        """
+        Stops the worker processes.
+        :return: service closed
+        """
+        if self.executor:
+            self.executor.shutdown()
+            self.executor = None
+        return
+
+
+class RequestHandler(BaseHTTPRequestHandler):
+    """
+    HTTP front of the migration service: POST '/migrate' with a JSON request answers with a JSON response, 200 for
+    a migrated assessment, 400 for an invalid request and 422 for an assessment that failed to migrate.
+    """
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        if self.path != '/migrate':
+            self.send_json(404, {'error': f"Not found: {self.path}"})
+            return
+        try:
+            request = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+        except ValueError as e:
+            self.send_json(400, {'error': f"Invalid JSON request: {e}"})
+            return
+        if not isinstance(request, dict):
+            self.send_json(400, {'error': "The request must be a JSON object"})
+            return
+        response = self.server.service.handle(request)
+        self.send_json(422 if 'error' in response else 200, response)
+        return
+
+    def send_json(self, status: int, response: dict):
+        """
+        Sends a JSON response.
+        :param status: HTTP status code
+        :param response: response
+        :return: response sent
+        """
+        body = json.dumps(response).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        return
+
+
+def parse_args(argv: list = None) -> argparse.Namespace:
+    """
+    Parses the command-line options of the migration service.
+    :param argv: list of command-line arguments, sys.argv by default
+    :return: the parsed options
+    """
+    parser = argparse.ArgumentParser(description='Long-lived service migrating CAMSS Assessments EIF Scenario graphs '
+                                                 'to version 6.0.0, one at a time.')
+    parser.add_argument('--http', type=int, metavar='PORT',
+                        help='serve HTTP requests on this port, instead of JSON Lines on the standard input')
+    parser.add_argument('--host', default='127.0.0.1', help='address of the HTTP service (default: 127.0.0.1)')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='number of worker processes migrating requests (default: 1)')
+    parser.add_argument('--deterministic', action='store_true',
+                        help='derive the identifiers of new scores and statements from their content')
+    parser.add_argument('--validate', action='store_true', help='validate the migrated graphs')
+    parser.add_argument('--input-dir', default='arti/in',
+                        help="folder of the files that requests can give by their 'path' (default: arti/in)")
+    parser.add_argument('--table', nargs=3, action='append', dest='tables', metavar=('PATH', 'SOURCE', 'TARGET'),
+                        help='further migration table, chained with the default one')
+    return parser.parse_args(argv)
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    service = MigrationService(args.workers, args.deterministic, args.validate, args.tables, args.input_dir)
+    # a terminated service stops its worker processes
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    try:
+        if args.http is not None:
+            service.serve_http(args.host, args.http)
+        else:
+            service.serve_lines()
+    finally:
+        service.close()
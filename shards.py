@@ -0,0 +1,138 @@
+import io
+import os
+import json
+import zlib
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from rdflib import Graph
+from namespaces import CAV
+from writer import write_file, write_graph
+
+
+def get_shard(ass_id: str, shards: int) -> int:
+    """
+    Assigns an assessment to a shard by the hash of its identifier, so that an assessment stays in the same shard
+    from one run to the next.
+    :param ass_id: identifier of the assessment
+    :param shards: number of shards
+    :return: shard of the assessment
+    """
+    return zlib.crc32(ass_id.encode('utf-8')) % shards
+
+
+def split_assessments(g: Graph) -> tuple:
+    """
+    Splits the assessments graph into the subgraph of each assessment, i.e. the triples of the assessment and of its
+    statements and scores, and the triples that belong to no assessment, in two passes over the graph.
+    :param g: assessments graph
+    :return: triples per assessment identifier, and the other triples
+    """
+    owners = {}
+    for s, p, o in g.triples((None, CAV.resultsIn, None)):
+        owners[s] = owners[o] = s
+    for s, p, o in g.triples((None, CAV.refersTo, None)):
+        if s in owners:
+            owners[o] = owners[s]
+    assessments, common = {}, []
+    for triple in g:
+        owner = owners.get(triple[0])
+        if owner is None:
+            common.append(triple)
+        else:
+            assessments.setdefault(str(owner).split("/")[-1], []).append(triple)
+    return assessments, common
+
+
+def write_shards(g: Graph, index_path: str, shards: int, workers: int = 4) -> str:
+    """
+    Writes the assessments graph as N-Triples shards, with the assessments assigned to shards by the hash of their
+    identifier, a file of the triples that belong to no assessment, and an index giving the shard, byte offset and
+    length of each assessment, so that a single assessment is read with one seek. The subgraph of an assessment is
+    a contiguous, self-contained block of its shard. Shards whose content has not changed since the previous index
+    are not written again, so incremental runs only replace the shards of the changed assessments. Shards are
+    written in parallel, and the index last.
+    :param g: assessments graph
+    :param index_path: filepath of the index; shards are written to the 'shards' subfolder of its folder
+    :param shards: number of shards
+    :param workers: number of threads writing the shards
+    :return: filepath of the index
+    """
+    folder = os.path.dirname(index_path)
+    os.makedirs(os.path.join(folder, 'shards'), exist_ok=True)
+    previous = load_index(index_path) if os.path.exists(index_path) else {'files': {}}
+    assessments, common = split_assessments(g)
+    buffers = {'shards/common.nt': io.BytesIO()}
+    write_graph(common, buffers['shards/common.nt'], 'nt')
+    index = {'shards': shards, 'files': {}, 'assessments': {}}
+    for ass_id in sorted(assessments):
+        name = f'shards/shard-{get_shard(ass_id, shards):03d}.nt'
+        out = buffers.setdefault(name, io.BytesIO())
+        start = out.tell()
+        write_graph(assessments[ass_id], out, 'nt')
+        index['assessments'][ass_id] = [name, start, out.tell() - start]
+    changed = []
+    for name, out in sorted(buffers.items()):
+        data = out.getvalue()
+        index['files'][name] = hashlib.sha256(data).hexdigest()
+        if previous['files'].get(name) != index['files'][name] or not os.path.exists(os.path.join(folder, name)):
+            changed.append((os.path.join(folder, name), data))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(lambda item: write_file(*item), changed))
+    # shards left over from a previous run with more shards
+    for name in set(previous['files']) - set(index['files']):
+        if os.path.exists(os.path.join(folder, name)):
+            os.remove(os.path.join(folder, name))
+    write_file(index_path, json.dumps(index, indent=1, sort_keys=True).encode('utf-8'))
+    return index_path
+
+
+def load_index(index_path: str) -> dict:
+    """
+    Reads the index of the shards of an assessments graph.
+    :param index_path: filepath of the index
+    :return: the index
+    """
+    with open(index_path, 'r') as f:
+        return json.load(f)
+
+
+def read_shards(index_path: str) -> Graph:
+    """
+    Reads the complete assessments graph from its shards.
+    :param index_path: filepath of the index
+    :return: the assessments graph
+    """
+    folder = os.path.dirname(index_path)
+    g = Graph()
+    for name in sorted(load_index(index_path)['files']):
+        g.parse(os.path.join(folder, name), format='nt')
+    return g
+
+
+def read_block(ass_id: str, index_path: str = 'arti/out/CAMSS_Assessments_graph/CAMSS_Assessments_graph.json',
+               index: dict = None) -> bytes:
+    """
+    Reads the N-Triples of a single assessment from its shard, with one seek.
+    :param ass_id: identifier of the assessment
+    :param index_path: filepath of the index
+    :param index: the index, when already read
+    :return: N-Triples of the assessment
+    """
+    name, start, length = (index or load_index(index_path))['assessments'][ass_id]
+    with open(os.path.join(os.path.dirname(index_path), name), 'rb') as f:
+        f.seek(start)
+        return f.read(length)
+
+
+def read_assessment(ass_id: str, index_path: str = 'arti/out/CAMSS_Assessments_graph/CAMSS_Assessments_graph.json',
+                    index: dict = None) -> Graph:
+    """
+    Reads the subgraph of a single assessment from its shard, with one seek.
+    :param ass_id: identifier of the assessment
+    :param index_path: filepath of the index
+    :param index: the index, when already read
+    :return: the subgraph of the assessment
+    """
+    g = Graph()
+    g.parse(data=read_block(ass_id, index_path, index), format='nt')
+    return g
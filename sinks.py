@@ -0,0 +1,184 @@
+import os
+import time
+import http.client
+from urllib.parse import urlsplit, quote
+from rdflib import URIRef, Dataset
+from writer import nt_line
+
+# destinations of the migrated individual assessment graphs
+SINKS = ['files', 'dataset', 'sparql-update', 'gsp']
+
+
+class DatasetSink:
+    """
+    In-process stand-in of a triplestore: an rdflib Dataset holding one named graph per assessment, written as
+    TriG when the sink is closed, if a destination is given.
+    """
+    dataset: Dataset
+    destination: str
+
+    def __init__(self, dataset: Dataset = None, destination: str = None):
+        """
+        :param dataset: dataset where the graphs are loaded, a new one by default
+        :param destination: filepath of the TriG file written when the sink is closed, if any
+        """
+        self.dataset = dataset if dataset is not None else Dataset()
+        self.destination = destination
+        return
+
+    def write(self, name: URIRef, triples: list) -> str:
+        """
+        Replaces a named graph by the migrated triples of an assessment.
+        :param name: name of the graph
+        :param triples: migrated triples
+        :return: name of the graph
+        """
+        self.dataset.remove_graph(name)
+        graph = self.dataset.graph(name)
+        graph.addN((s, p, o, graph) for s, p, o in triples)
+        return str(name)
+
+    def close(self) -> str:
+        """
+        Writes the dataset, if a destination is given.
+        :return: filepath of the dataset, or None
+        """
+        if self.destination:
+            os.makedirs(os.path.dirname(self.destination), exist_ok=True)
+            self.dataset.serialize(format='trig', destination=self.destination)
+        return self.destination
+
+
+class SparqlSink:
+    """
+    Bulk load of the migrated graphs into a triplestore, one named graph per assessment, either with SPARQL 1.1
+    Update requests (DROP SILENT GRAPH and INSERT DATA) or with SPARQL 1.1 Graph Store Protocol requests (PUT, then
+    POST for the following chunks). Triples are sent as N-Triples in chunks over a single persistent HTTP
+    connection, which is opened again when it fails. Failed requests, i.e. connection errors, 429 and 5xx
+    responses, are retried with exponential backoff; other responses raise a ValueError. Every request replaces or
+    adds the same triples when repeated, so retries are safe.
+    """
+    endpoint: str
+    protocol: str
+    chunk_size: int
+    retries: int
+    backoff: float
+    timeout: float
+
+    def __init__(self, endpoint: str, protocol: str = 'sparql-update', chunk_size: int = 10000, retries: int = 3,
+                 backoff: float = 1.0, timeout: float = 60.0):
+        """
+        :param endpoint: URL of the SPARQL Update endpoint or of the Graph Store Protocol service
+        :param protocol: 'sparql-update' or 'gsp'
+        :param chunk_size: number of triples per request
+        :param retries: number of retries of a failed request
+        :param backoff: seconds before the first retry, doubled after each retry
+        :param timeout: seconds before a request times out
+        """
+        if protocol not in ('sparql-update', 'gsp'):
+            raise ValueError(f"Unknown protocol of the triplestore: {protocol}")
+        url = urlsplit(endpoint)
+        if url.scheme not in ('http', 'https') or not url.hostname:
+            raise ValueError(f"Invalid endpoint of the triplestore: {endpoint}")
+        self.endpoint = endpoint
+        self.protocol = protocol
+        self.chunk_size = chunk_size
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.url = url
+        self.connection = None
+        return
+
+    def get_connection(self) -> http.client.HTTPConnection:
+        """
+        Provides the persistent connection to the triplestore, opening it when needed.
+        :return: HTTP or HTTPS connection
+        """
+        if self.connection is None:
+            cls = http.client.HTTPSConnection if self.url.scheme == 'https' else http.client.HTTPConnection
+            self.connection = cls(self.url.hostname, self.url.port, timeout=self.timeout)
+        return self.connection
+
+    def request(self, method: str, target: str, body: bytes, content_type: str):
+        """
+        Sends a request to the triplestore, retrying it when it fails.
+        :param method: HTTP method
+        :param target: path and query of the request
+        :param body: body of the request
+        :param content_type: media type of the body
+        :return: request completed
+        """
+        error = None
+        for attempt in range(self.retries + 1):
+            if attempt:
+                time.sleep(self.backoff * 2 ** (attempt - 1))
+            try:
+                connection = self.get_connection()
+                connection.request(method, target, body, {'Content-Type': content_type})
+                response = connection.getresponse()
+                # the response is read completely so that the connection can be reused
+                message = response.read().decode('utf-8', 'replace')
+            except (OSError, http.client.HTTPException) as e:
+                self.close()
+                error = e
+                continue
+            if response.status < 300:
+                return
+            if response.status != 429 and response.status < 500:
+                raise ValueError(f"The triplestore rejected the request: {response.status} {response.reason} "
+                                 f"{message[:200]}")
+            error = f"{response.status} {response.reason}"
+        raise ConnectionError(f"The triplestore request failed after {self.retries + 1} attempts: {error}")
+
+    def write(self, name: URIRef, triples: list) -> str:
+        """
+        Replaces a named graph by the migrated triples of an assessment, in chunks.
+        :param name: name of the graph
+        :param triples: migrated triples
+        :return: name of the graph
+        """
+        lines = [nt_line(triple) for triple in triples]
+        path = self.url.path or '/'
+        graph = f"graph={quote(str(name), safe='')}"
+        # the first request replaces the graph, even when there are no triples
+        for start in range(0, max(len(lines), 1), self.chunk_size):
+            chunk = ''.join(lines[start:start + self.chunk_size])
+            if self.protocol == 'gsp':
+                target = f"{path}?{self.url.query + '&' if self.url.query else ''}{graph}"
+                self.request('PUT' if start == 0 else 'POST', target, chunk.encode('utf-8'),
+                             'application/n-triples')
+            else:
+                target = f"{path}?{self.url.query}" if self.url.query else path
+                update = (f'DROP SILENT GRAPH <{name}> ;\n' if start == 0 else '') + \
+                         f'INSERT DATA {{ GRAPH <{name}> {{\n{chunk}}} }}'
+                self.request('POST', target, update.encode('utf-8'), 'application/sparql-update')
+        return str(name)
+
+    def close(self):
+        """
+        Closes the connection to the triplestore.
+        :return: connection closed
+        """
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+        return
+
+
+def open_sink(sink: str = 'files', endpoint: str = None):
+    """
+    Opens the destination of the migrated individual assessment graphs, other than Turtle files.
+    :param sink: 'files', 'dataset', 'sparql-update' or 'gsp'
+    :param endpoint: URL of the triplestore, for 'sparql-update' and 'gsp'
+    :return: the sink, or None for Turtle files
+    """
+    if sink not in SINKS:
+        raise ValueError(f"Unknown sink: {sink}")
+    if sink == 'files':
+        return None
+    if sink == 'dataset':
+        return DatasetSink(destination='arti/out/CAMSS_Assessments.trig')
+    if not endpoint:
+        raise ValueError(f"The {sink} sink requires the endpoint of the triplestore")
+    return SparqlSink(endpoint, sink)
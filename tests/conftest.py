@@ -0,0 +1,40 @@
+import os
+import sys
+import shutil
+import logging
+import pytest
+
+# the modules of the migration are at the root of the repository
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from namespaces import CAV
+# rdflib logs every empty xsd:date literal of the inputs
+logging.getLogger('rdflib.term').setLevel(logging.CRITICAL)
+
+
+@pytest.fixture
+def workspace(tmp_path, monkeypatch):
+    """
+    Working folder with the migration table and the input graphs, as the migration reads and writes paths relative
+    to the working folder.
+    :return: path of the working folder
+    """
+    shutil.copy(os.path.join(ROOT, 'migrationtables.csv'), tmp_path)
+    shutil.copytree(os.path.join(ROOT, 'arti', 'in'), tmp_path / 'arti' / 'in')
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def canonical(g) -> set:
+    """
+    Replaces the identifiers of the scores and statements of a migrated graph, random unless deterministic, by their
+    content, so that migrations can be compared whatever their identifiers.
+    :param g: migrated graph
+    :return: set of triples
+    """
+    labels = {}
+    for s in set(g.subjects(CAV.value)):
+        labels[s] = ('score', str(g.value(s, CAV.value)), str(g.value(s, CAV.assignedTo)))
+    for s in set(g.subjects(CAV.refersTo)):
+        labels[s] = ('statement', str(g.value(s, CAV.judgement)), labels.get(g.value(s, CAV.refersTo)))
+    return {(labels.get(s, s), p, labels.get(o, o)) for s, p, o in g}
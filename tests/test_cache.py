@@ -0,0 +1,66 @@
+import os
+import glob
+from rdflib.compare import isomorphic
+from cache import ParseCache
+from manifest import file_hash
+from migration import main, migrate_assessment
+from writer import read_graph
+
+INPUT = 'arti/in/EIF-5.1.0-CAMSSAssessment_CLV.ttl'
+
+
+def test_cached_graph_is_isomorphic(workspace):
+    cache = ParseCache()
+    assert cache.load(INPUT) is None
+    g = read_graph(INPUT)
+    cache.store(INPUT, g)
+    cached = cache.load(INPUT)
+    assert isomorphic(cached, g)
+    assert dict(cached.namespaces()) == dict(g.namespaces())
+
+
+def test_keys_of_known_content_and_hashes(workspace):
+    with open(INPUT, 'rb') as f:
+        data = f.read()
+    key = ParseCache().get_key(INPUT)
+    assert ParseCache().get_key(INPUT, data) == key
+    assert ParseCache(hashes={INPUT: file_hash(INPUT)}).get_key(INPUT) == key
+    # a known hash is not computed again from the file
+    assert ParseCache(hashes={INPUT: 'known'}).get_key(INPUT) != key
+
+
+def test_cached_migration_is_byte_identical(workspace):
+    outputs = []
+    for cache in (None, ParseCache(), ParseCache()):
+        migrate_assessment(INPUT, deterministic=True, cache=cache,
+                           write=lambda destination, data: outputs.append(data))
+    assert outputs[0] == outputs[1] == outputs[2]
+
+
+def test_prune_keeps_only_given_hashes(workspace):
+    cache = ParseCache()
+    other = 'arti/in/EIF-5.1.0-CAMSSAssessment_DNS.ttl'
+    for path in (INPUT, other):
+        cache.store(path, read_graph(path))
+    stale = os.path.join(cache.directory, 'stale-rdflib0-v0.pickle')
+    open(stale, 'wb').close()
+    removed = cache.prune([file_hash(INPUT)])
+    assert sorted(removed) == sorted([cache.get_key(other), stale])
+    assert os.listdir(cache.directory) == [os.path.basename(cache.get_key(INPUT))]
+
+
+def test_run_caches_only_input_graphs(workspace, monkeypatch):
+    inputs = sorted(glob.glob('arti/in/*.ttl'))
+    for path in inputs[2:]:
+        workspace.joinpath(path).unlink()
+    inputs = inputs[:2] + ['arti/in/AssessmentsG/CAMSS_Ontology_Assessments_graph.ttl']
+    # the worker processes use the cache installed once in each of them
+    assert main(workers=2, cache=True, deterministic=True) == {}
+    assert sorted(glob.glob('arti/cache/*')) == sorted(ParseCache().entry_path(file_hash(path)) for path in inputs)
+    stored = []
+    monkeypatch.setattr(ParseCache, 'store', lambda self, path, g, data=None: stored.append(path))
+    with open(inputs[0], 'a') as f:
+        f.write('# changed\n')
+    # the previous assessments graph that is patched is not cached
+    assert main(incremental=True, cache=True, deterministic=True) == {}
+    assert stored == [inputs[0]]
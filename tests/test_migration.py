@@ -0,0 +1,251 @@
+import os
+import glob
+import shutil
+import pytest
+from rdflib import Graph, Literal, URIRef
+from rdflib.compare import isomorphic
+from assembly import StreamingAssembly
+from migration import GraphInstance, Scenario, migrate_assessment, main
+from namespaces import CAMSS, CAV, SC, STATUS, TOOL
+from report import ScoresReport
+from writer import read_graph
+from conftest import canonical
+
+INPUT = 'arti/in/EIF-5.1.0-CAMSSAssessment_CLV.ttl'
+ASSESSMENTS = 'arti/in/AssessmentsG/CAMSS_Ontology_Assessments_graph.ttl'
+V700 = 'v700-test'
+
+
+def migrated_bytes(path: str, **options) -> bytes:
+    """
+    :param path: filepath of the individual assessment graph
+    :param options: options of migrate_assessment
+    :return: serialised migrated graph
+    """
+    outputs = []
+    migrate_assessment(path, write=lambda destination, data: outputs.append(data), **options)
+    return outputs[0]
+
+
+def parse(data: bytes, output_format: str = 'turtle') -> Graph:
+    g = Graph()
+    g.parse(data=data, format=output_format)
+    return g
+
+
+@pytest.mark.parametrize('output_format', ['turtle', 'nt'])
+def test_deterministic_migration_is_byte_identical(workspace, output_format):
+    first = migrated_bytes(INPUT, deterministic=True, output_format=output_format)
+    second = migrated_bytes(INPUT, deterministic=True, output_format=output_format)
+    assert first == second
+    assert isomorphic(parse(first, output_format), parse(second, output_format))
+
+
+def test_deterministic_migration_matches_random_migration(workspace):
+    deterministic = parse(migrated_bytes(INPUT, deterministic=True))
+    random = parse(migrated_bytes(INPUT))
+    assert not isomorphic(deterministic, random)
+    assert canonical(deterministic) == canonical(random)
+
+
+def test_deterministic_run_is_byte_identical(workspace):
+    # a few assessments, to keep the run short
+    for path in sorted(glob.glob('arti/in/*.ttl'))[3:]:
+        workspace.joinpath(path).unlink()
+    outputs = []
+    for _ in range(2):
+        assert main(deterministic=True) == {}
+        outputs.append({path: open(path, 'rb').read() for path in sorted(glob.glob('arti/out/**/*.ttl',
+                                                                                     recursive=True))})
+    assert len(outputs[0]) == 4
+    assert outputs[0] == outputs[1]
+
+
+@pytest.mark.parametrize('share', [0.1, 0.9])
+def test_rewrite_applies_deletions_and_insertions(workspace, share):
+    # a small share of deleted triples is removed from the graph, a large one gives a new graph
+    graph = GraphInstance(INPUT)
+    original = list(graph.g)
+    delete = set(original[:int(len(original) * share)])
+    insert = [(s, p, Literal('new')) for s, p, o in original[:5]]
+    namespaces = dict(graph.g.namespaces())
+    graph.rewrite(delete, insert)
+    expected = Graph()
+    for triple in original + insert:
+        if triple not in delete or triple in insert:
+            expected.add(triple)
+    assert isomorphic(graph.g, expected)
+    assert dict(graph.g.namespaces()) == namespaces
+
+
+def test_merged_assessments_graph_matches_streaming_assembly(workspace):
+    results = [migrate_assessment(path, deterministic=True, serialize=False)
+               for path in sorted(glob.glob('arti/in/*.ttl'))[:3]]
+    # an assessment migrated twice keeps its last migration
+    results.append(migrate_assessment(results[0].input_path, serialize=False))
+    merged = GraphInstance(ASSESSMENTS)
+    merged.merge_results(results)
+    assembly = StreamingAssembly(GraphInstance(ASSESSMENTS).g, str(workspace / 'assembled.nt'))
+    for result in results:
+        assembly.add(result.ass_id, result.triples)
+    assert isomorphic(merged.g, read_graph(assembly.close()))
+    assert set(results[-1].triples) <= set(merged.g)
+
+
+def test_interrupted_assembly_keeps_previous_output(workspace, monkeypatch):
+    destination = str(workspace / 'assembled.nt')
+    with open(destination, 'w') as f:
+        f.write('previous\n')
+    result = migrate_assessment(INPUT, deterministic=True, serialize=False)
+    assembly = StreamingAssembly(GraphInstance(ASSESSMENTS).g, destination)
+    # an assessment migrated twice, so that the output is copied without its first migration
+    for _ in range(2):
+        assembly.add(result.ass_id, result.triples)
+
+    def interrupt(path):
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr('os.path.getsize', interrupt)
+    with pytest.raises(KeyboardInterrupt):
+        assembly.close()
+    assert open(destination).read() == 'previous\n'
+
+
+def run_outputs() -> dict:
+    """
+    :return: content per filepath of the outputs of a run
+    """
+    paths = glob.glob('arti/out/**/*.*', recursive=True) + glob.glob('arti/punct/*.*')
+    return {path: open(path, 'rb').read() for path in sorted(paths)}
+
+
+def test_resumed_run_is_byte_identical(workspace, monkeypatch):
+    for path in sorted(glob.glob('arti/in/*.ttl'))[3:]:
+        workspace.joinpath(path).unlink()
+    assert main(deterministic=True) == {}
+    expected = run_outputs()
+    shutil.rmtree('arti/out')
+    shutil.rmtree('arti/punct')
+
+    def interrupt(self):
+        raise KeyboardInterrupt
+
+    # interrupted once every assessment is migrated, before the assessments graph is written
+    with monkeypatch.context() as patched:
+        patched.setattr(ScoresReport, 'close', interrupt)
+        with pytest.raises(KeyboardInterrupt):
+            main(deterministic=True)
+    assert os.path.exists('arti/out/journal.jsonl')
+    assert main(deterministic=True, resume=True) == {}
+    assert run_outputs() == expected
+
+
+def set_status(path: str, status: URIRef):
+    """
+    Changes the status of an individual assessment in place.
+    :param path: filepath of the individual assessment graph
+    :param status: new status of the assessment
+    """
+    g = read_graph(path)
+    g.set((next(g.subjects(CAV.status)), CAV.status, status))
+    g.serialize(path, format='turtle')
+    return
+
+
+@pytest.mark.parametrize('streaming', [False, True])
+def test_incremental_patch_equals_full_rebuild(workspace, streaming):
+    for path in sorted(glob.glob('arti/in/*.ttl'))[3:]:
+        if path != INPUT:
+            workspace.joinpath(path).unlink()
+    assert main(deterministic=True, streaming=streaming) == {}
+    # each patch must drop the values of the previous one, not only those of the assessments graph
+    for status in (STATUS.Draft, STATUS.Withdrawn):
+        set_status(INPUT, status)
+        assert main(incremental=True, deterministic=True, streaming=streaming) == {}
+    outputs = sorted(glob.glob('arti/out/CAMSS_Assessments_graph/*'))
+    # the streamed N-Triples follow the order of migration, hence the comparison of triples
+    patched = {path: set(read_graph(path)) for path in outputs}
+    assert main(deterministic=True, streaming=streaming) == {}
+    assert patched == {path: set(read_graph(path)) for path in outputs}
+    assessment = next(read_graph(INPUT).subjects(CAV.status))
+    assert set(read_graph(outputs[0]).objects(assessment, CAV.status)) == {STATUS.Withdrawn}
+
+
+def unknown_criteria(path: str, count: int = None) -> str:
+    """
+    Writes a copy of an assessment whose first scores are assigned to criteria that are not in the migration table.
+    :param path: filepath of the individual assessment graph
+    :param count: number of scores reassigned, all of them by default
+    :return: filepath of the copy, and number of scores reassigned
+    """
+    g = read_graph(path)
+    scores = sorted(g.subjects(CAV.assignedTo))[:count]
+    for i, score in enumerate(scores):
+        g.set((score, CAV.assignedTo, URIRef(SC + f'c-unknown{i}', SC)))
+    copy = path.replace('.ttl', ' unknown.ttl')
+    g.serialize(copy, format='turtle')
+    return copy, len(scores)
+
+
+def scores_per_criterion(result) -> dict:
+    g = Graph()
+    g.addN((s, p, o, g) for s, p, o in result.triples)
+    return {str(g.value(score, CAV.assignedTo)): str(value) for score, value in g.subject_objects(CAV.value)}
+
+
+def test_unknown_criteria_are_reported_and_skipped(workspace):
+    # the first response of the assessment has no slot either
+    path, count = unknown_criteria(INPUT)
+    result = migrate_assessment(path, deterministic=True, serialize=False, validate=True)
+    assert len([issue for issue in result.issues if 'is not in the migration table' in issue]) == count
+
+
+def test_unknown_criterion_does_not_change_other_scores(workspace):
+    expected = scores_per_criterion(migrate_assessment(INPUT, deterministic=True, serialize=False))
+    result = migrate_assessment(unknown_criteria(INPUT, 1)[0], deterministic=True, serialize=False, validate=True)
+    assert len([issue for issue in result.issues if 'is not in the migration table' in issue]) == 1
+    scores = scores_per_criterion(result)
+    changed = {criterion for criterion in expected if scores.get(criterion) != expected[criterion]}
+    # only the slot of the reassigned criterion loses its response, no other slot takes it
+    assert len(changed) <= 1
+    for criterion in changed:
+        assert scores[criterion] == 'None' or scores[criterion].count('+') < expected[criterion].count('+')
+
+
+@pytest.fixture
+def scenario(workspace, monkeypatch):
+    """
+    Registry of migration tables with a 7.0.0 scenario, restored after the test.
+    """
+    monkeypatch.setattr(Scenario, 'tables', list(Scenario.tables))
+    monkeypatch.setitem(Scenario.versions, V700, '7.0.0')
+    # 6.0.0 to 7.0.0 table that keeps every criterion
+    with open('migrationtables.csv') as csv, open('v700.csv', 'w') as table:
+        for line in csv:
+            label, _, _, criterion = line.rstrip().split(',')
+            table.write(f'{label},{criterion},,{criterion}\n')
+    yield Scenario()
+    monkeypatch.undo()
+    Scenario()
+
+
+def test_chained_table_migrates_to_latest_scenario(scenario):
+    expected = migrate_assessment(INPUT, deterministic=True, serialize=False, validate=True).issues
+    scenario.register_table('v700.csv', Scenario.v600, V700)
+    result = migrate_assessment(INPUT, deterministic=True, serialize=False, validate=True)
+    g = Graph()
+    g.addN((s, p, o, g) for s, p, o in result.triples)
+    assert set(g.objects(predicate=CAV.contextualisedBy)) == {URIRef(SC + V700, SC)}
+    assert set(g.objects(predicate=CAMSS.toolVersion)) == {URIRef(TOOL + '7.0.0', TOOL)}
+    # only the merged scores of the assessment, as in 6.0.0
+    assert result.issues == expected
+
+
+@pytest.mark.parametrize('source, target', [(Scenario.v510, V700), (Scenario.v600, 'v800-test')])
+def test_table_out_of_chain_is_rejected(scenario, source, target):
+    # a second table from 5.1.0, and a table to a scenario of unknown tool version
+    tables = list(Scenario.tables)
+    with pytest.raises(ValueError):
+        scenario.register_table('v700.csv', source, target)
+    assert Scenario.tables == tables
+    assert Scenario.latest == Scenario.v600
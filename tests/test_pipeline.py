@@ -0,0 +1,81 @@
+import os
+import glob
+import time
+from types import SimpleNamespace
+from concurrent.futures import ProcessPoolExecutor
+import pytest
+from manifest import Journal
+from migration import main
+from pipeline import Pipeline
+from writer import write_file
+
+
+def fake_migrate(path: str, data: bytes = None, write=None):
+    """
+    Stand-in for the migration of an input file, slower for the first files so that they finish last.
+    :param path: filepath of the input file
+    :param data: content of the file
+    :param write: function writing the output in this process; worker processes write it themselves
+    :return: result with the filepath of the output
+    """
+    time.sleep(0.05 / (int(os.path.basename(path)) + 1))
+    output = path + '.out'
+    (write or write_file)(output, data.upper())
+    return SimpleNamespace(input_path=path, output=output, error=None)
+
+
+@pytest.fixture
+def inputs(tmp_path) -> list:
+    paths = []
+    for i in range(6):
+        path = str(tmp_path / str(i))
+        with open(path, 'wb') as f:
+            f.write(b'input %d' % i)
+        paths.append(path)
+    return paths
+
+
+@pytest.mark.parametrize('workers', [0, 2])
+def test_results_keep_input_order(inputs, workers):
+    executor = ProcessPoolExecutor(max_workers=workers) if workers else None
+    try:
+        results = list(Pipeline(2).run(inputs, fake_migrate, executor))
+    finally:
+        if executor:
+            executor.shutdown()
+    assert [result.input_path for result in results] == inputs
+    for result in results:
+        assert result.error is None
+        assert open(result.output, 'rb').read() == open(result.input_path, 'rb').read().upper()
+
+
+def test_failed_write_fails_only_its_result(inputs, tmp_path):
+    # the folder of the output of the third file is a file
+    blocker = str(tmp_path / 'blocker')
+    open(blocker, 'wb').close()
+
+    def migrate(path: str, data: bytes = None, write=None):
+        output = os.path.join(blocker, 'out') if path == inputs[2] else path + '.out'
+        write(output, data)
+        return SimpleNamespace(input_path=path, output=output, error=None)
+
+    results = list(Pipeline(2).run(inputs, migrate))
+    assert [result.error is not None for result in results] == [i == 2 for i in range(6)]
+    assert all(os.path.exists(result.output) for result in results if not result.error)
+    assert not glob.glob(str(tmp_path / '*.part'))
+
+
+def test_journal_records_only_written_outputs(workspace, monkeypatch):
+    for path in sorted(glob.glob('arti/in/*.ttl'))[4:]:
+        workspace.joinpath(path).unlink()
+    recorded = []
+    record = Journal.record
+
+    def checked_record(self, input_path: str, entry: dict):
+        assert os.path.exists(entry['output'])
+        recorded.append(input_path)
+        record(self, input_path, entry)
+
+    monkeypatch.setattr(Journal, 'record', checked_record)
+    assert main(pipeline=2, deterministic=True) == {}
+    assert len(recorded) == 4
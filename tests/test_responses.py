@@ -0,0 +1,74 @@
+import os
+import glob
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from rdflib import Graph
+from migration import migrate_assessment
+from responses import ResponseTable, NO, YES, NOT_APPLICABLE, SCORES, score_code
+from writer import read_graph
+from conftest import ROOT, canonical
+
+
+def test_merged_statements_and_scores():
+    table = ResponseTable(3)
+    table.add(0, 'first', '20')
+    table.add(0, 'second', '100')
+    table.set(1, 'c1', score='100', answer=NOT_APPLICABLE)
+    assert table.get_statement(0) == 'first\n\nsecond'
+    assert table.get_score(0) == '20+100'
+    assert table.get_criterion(0) == 'None'
+    assert (table.get_criterion(1), table.get_score(1), table.get_statement(1)) == ('c1', '100', 'None')
+    assert table.get_score(2) == 'None'
+
+
+def test_missing_score_is_replaced_by_the_next_one():
+    table = ResponseTable(1)
+    table.add(0, 'first', 'None')
+    table.add(0, 'second', '20')
+    assert table.get_score(0) == '20'
+
+
+def test_count_answers():
+    table = ResponseTable(4)
+    table.answers[0] = table.answers[1] = NO
+    table.answers[2] = YES
+    assert (table.count(NO), table.count(YES), table.count(NOT_APPLICABLE)) == (2, 1, 0)
+    assert table.get_answer(2) == 'Yes/Gradient'
+
+
+@pytest.mark.parametrize('path', sorted(glob.glob(os.path.join(ROOT, 'arti', 'in', '*.ttl'))), ids=os.path.basename)
+def test_migration_matches_reference_output(monkeypatch, path):
+    # the outputs in 'arti/out/' were written by the migration before the response table; nothing is written here
+    monkeypatch.chdir(ROOT)
+    result = migrate_assessment(os.path.relpath(path, ROOT), serialize=False)
+    migrated = Graph()
+    migrated.addN((s, p, o, migrated) for s, p, o in result.triples)
+    reference = read_graph(os.path.join(ROOT, 'arti', 'out', f'EIF-6.0.0-CAMSSAssessment_{result.ttl_filename}.ttl'))
+    assert canonical(migrated) == canonical(reference)
+
+
+def test_unknown_scores_are_not_interned():
+    # the score codes do not grow with the scores met, e.g. in the long-lived service
+    table = ResponseTable(2)
+    table.add(0, 'statement', '20')
+    table.add(0, 'statement', '25')
+    table.set(1, 'c1', score='unknown')
+    assert table.get_score(0) == '20+25'
+    assert table.get_score(1) == 'unknown'
+    assert score_code('20') == SCORES.index('20')
+    assert len(SCORES) == len(set(SCORES)) == 7
+
+
+def test_scores_from_concurrent_threads():
+    values = [str(i % 120) for i in range(20000)]
+
+    def scores(offset: int) -> list:
+        table = ResponseTable(1)
+        for value in values[offset:] + values[:offset]:
+            table.set(0, 'c', score=value)
+            assert table.get_score(0) == value
+        return table.get_score(0)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        assert list(pool.map(scores, range(0, 20000, 2500))) == [values[offset - 1] for offset in range(0, 20000, 2500)]
+    assert len(SCORES) == 7
@@ -0,0 +1,45 @@
+import os
+import json
+import pytest
+from service import MigrationService, resolve_path
+
+INPUT = 'arti/in/EIF-5.1.0-CAMSSAssessment_CLV.ttl'
+
+
+@pytest.fixture
+def service(workspace):
+    service = MigrationService(deterministic=True)
+    yield service
+    service.close()
+
+
+def test_resolve_path(workspace):
+    assert resolve_path(INPUT, 'arti/in') == os.path.realpath(INPUT)
+    assert resolve_path('arti/in/../../migrationtables.csv', 'arti/in') is None
+    assert resolve_path('arti/in', 'arti/in') is None
+    os.symlink(os.path.realpath('migrationtables.csv'), 'arti/in/link.ttl')
+    assert resolve_path('arti/in/link.ttl', 'arti/in') is None
+
+
+def test_path_in_input_folder(service):
+    response = service.handle({'path': INPUT, 'id': 1})
+    assert 'error' not in response
+    assert response['id'] == 1 and response['name'] == 'CLV'
+
+
+def test_path_outside_input_folder(service, workspace):
+    secret = workspace / 'secret.txt'
+    secret.write_text('root:x:0:0:secret-line\n')
+    for path in (str(secret), 'arti/in/../secret.txt', '/etc/passwd'):
+        response = service.handle({'path': path})
+        assert 'secret' not in json.dumps(response)
+        assert response['error'] == "The 'path' of the request is not a file of the input folder of the service"
+
+
+def test_errors_do_not_quote_the_content(service, workspace):
+    response = service.handle({'turtle': 'root:x:0:0:secret-line\n', 'name': 'secret'})
+    assert 'secret-line' not in json.dumps(response)
+    assert response['error'].startswith('The assessment could not be migrated')
+    (workspace / 'arti' / 'in' / 'bad.ttl').write_text('root:x:0:0:secret-line\n')
+    response = service.handle({'path': 'arti/in/bad.ttl'})
+    assert 'secret-line' not in json.dumps(response)
@@ -0,0 +1,59 @@
+import os
+import pytest
+from rdflib import Graph, Literal
+from rdflib.compare import isomorphic
+import shards
+from shards import split_assessments, write_shards, read_shards, read_assessment, load_index, get_shard
+from namespaces import CAV
+from writer import read_graph
+from conftest import ROOT
+
+
+@pytest.fixture(scope='module')
+def assessments():
+    return read_graph(os.path.join(ROOT, 'arti', 'in', 'AssessmentsG', 'CAMSS_Ontology_Assessments_graph.ttl'))
+
+
+def subgraph(triples) -> Graph:
+    g = Graph()
+    g.addN((s, p, o, g) for s, p, o in triples)
+    return g
+
+
+def test_shards_union_is_isomorphic(tmp_path, assessments):
+    index_path = write_shards(assessments, str(tmp_path / 'graph.json'), 4)
+    assert isomorphic(read_shards(index_path), assessments)
+    assert len(load_index(index_path)['files']) == 5
+
+
+def test_read_single_assessment(tmp_path, assessments):
+    index_path = write_shards(assessments, str(tmp_path / 'graph.json'), 4)
+    index = load_index(index_path)
+    per_assessment, common = split_assessments(assessments)
+    for ass_id in sorted(per_assessment)[:5]:
+        assert index['assessments'][ass_id][0] == f'shards/shard-{get_shard(ass_id, 4):03d}.nt'
+        assert isomorphic(read_assessment(ass_id, index_path, index), subgraph(per_assessment[ass_id]))
+
+
+def test_only_changed_shards_are_written(tmp_path, assessments, monkeypatch):
+    index_path = str(tmp_path / 'graph.json')
+    write_shards(assessments, index_path, 4)
+    g = Graph()
+    g.addN((s, p, o, g) for s, p, o in assessments)
+    statement = next(g.objects(None, CAV.resultsIn))
+    ass_id = str(g.value(None, CAV.resultsIn, statement)).split("/")[-1]
+    g.set((statement, CAV.judgement, Literal('changed', lang='en')))
+    written = []
+    write_file = shards.write_file
+    monkeypatch.setattr(shards, 'write_file', lambda path, data: written.append(path) or write_file(path, data))
+    write_shards(g, index_path, 4)
+    assert sorted(written) == sorted([os.path.join(str(tmp_path), load_index(index_path)['assessments'][ass_id][0]),
+                                      index_path])
+    assert isomorphic(read_shards(index_path), g)
+
+
+def test_fewer_shards_remove_leftover_files(tmp_path, assessments):
+    index_path = str(tmp_path / 'graph.json')
+    write_shards(assessments, index_path, 8)
+    write_shards(assessments, index_path, 2)
+    assert sorted(os.listdir(tmp_path / 'shards')) == ['common.nt', 'shard-000.nt', 'shard-001.nt']
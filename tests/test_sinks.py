@@ -0,0 +1,101 @@
+import threading
+from urllib.parse import unquote
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import pytest
+from rdflib import Dataset, Literal, URIRef
+from migration import migrate_assessment
+from namespaces import CAMSSA
+from sinks import DatasetSink, SparqlSink
+
+INPUTS = ['arti/in/EIF-5.1.0-CAMSSAssessment_CLV.ttl', 'arti/in/EIF-5.1.0-CAMSSAssessment_DNS.ttl']
+EX = 'http://example.org/'
+
+
+class Triplestore(BaseHTTPRequestHandler):
+    """
+    Stub of a triplestore, answering with the scripted statuses and then with 204.
+    """
+    protocol_version = 'HTTP/1.1'
+    requests = []  # method, path and body of each request
+    statuses = []  # statuses of the next responses
+
+    def answer(self):
+        body = self.rfile.read(int(self.headers['Content-Length']))
+        self.requests.append((self.command, unquote(self.path), body.decode('utf-8')))
+        self.send_response(self.statuses.pop(0) if self.statuses else 204)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+        return
+
+    do_POST = do_PUT = answer
+
+    def log_message(self, *args):
+        return
+
+
+@pytest.fixture
+def triplestore():
+    Triplestore.requests, Triplestore.statuses = [], []
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Triplestore)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{server.server_port}/store'
+    server.shutdown()
+    server.server_close()
+
+
+def triples(count: int) -> list:
+    return [(URIRef(EX + 'a'), URIRef(EX + 'p'), Literal(i)) for i in range(count)]
+
+
+def test_dataset_holds_one_graph_per_assessment(workspace):
+    results = [migrate_assessment(path, deterministic=True, serialize=False) for path in INPUTS]
+    sink = DatasetSink(destination=str(workspace / 'out' / 'assessments.trig'))
+    # an assessment written twice keeps a single graph
+    for result in results + results[:1]:
+        sink.write(URIRef(CAMSSA + result.ass_id, CAMSSA), result.triples)
+    dataset = Dataset()
+    dataset.parse(sink.close(), format='trig')
+    names = {URIRef(CAMSSA + result.ass_id, CAMSSA) for result in results}
+    assert {graph.identifier for graph in dataset.graphs() if len(graph)} == names
+    for result in results:
+        assert set(dataset.graph(URIRef(CAMSSA + result.ass_id, CAMSSA))) == set(result.triples)
+
+
+@pytest.mark.parametrize('protocol', ['sparql-update', 'gsp'])
+def test_triples_are_sent_in_chunks(triplestore, protocol):
+    sink = SparqlSink(triplestore, protocol, chunk_size=2)
+    sink.write(URIRef(EX + 'g'), triples(5))
+    sink.close()
+    requests = Triplestore.requests
+    assert len(requests) == 3
+    assert sum(body.count(' .\n') for _, _, body in requests) == 5
+    if protocol == 'gsp':
+        assert [method for method, _, _ in requests] == ['PUT', 'POST', 'POST']
+        assert all(path == f'/store?graph={EX}g' for _, path, _ in requests)
+    else:
+        # only the first chunk replaces the graph
+        assert [body.startswith(f'DROP SILENT GRAPH <{EX}g>') for _, _, body in requests] == [True, False, False]
+        assert all(f'INSERT DATA {{ GRAPH <{EX}g>' in body for _, _, body in requests)
+
+
+def test_unavailable_triplestore_is_retried(triplestore):
+    Triplestore.statuses = [503, 429]
+    sink = SparqlSink(triplestore, backoff=0)
+    sink.write(URIRef(EX + 'g'), triples(1))
+    assert len(Triplestore.requests) == 3
+    assert len({body for _, _, body in Triplestore.requests}) == 1
+
+
+def test_retries_are_bounded(triplestore):
+    Triplestore.statuses = [503] * 3
+    with pytest.raises(ConnectionError):
+        SparqlSink(triplestore, retries=2, backoff=0).write(URIRef(EX + 'g'), triples(1))
+    assert len(Triplestore.requests) == 3
+
+
+def test_rejected_request_is_not_retried(triplestore):
+    Triplestore.statuses = [400]
+    with pytest.raises(ValueError):
+        SparqlSink(triplestore, backoff=0).write(URIRef(EX + 'g'), triples(1))
+    assert len(Triplestore.requests) == 1
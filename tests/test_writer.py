@@ -0,0 +1,91 @@
+import io
+import os
+import pytest
+from rdflib import Graph, Literal, URIRef, BNode, Namespace
+from rdflib.compare import isomorphic
+from rdflib.namespace import RDF, XSD
+from writer import write_graph, graph_bytes, save_graph, read_graph, get_extension
+from conftest import ROOT
+
+EX = Namespace('http://example.org/ns#')
+FORMATS = [('turtle', False), ('nt', False), ('turtle', True), ('nt', True)]
+
+
+def sample_graph() -> Graph:
+    """
+    :return: graph with literals and IRIs that need escaping or cannot be written as prefixed names
+    """
+    g = Graph()
+    g.bind('ex', EX)
+    g.add((EX.a, RDF.type, EX.Thing))
+    g.add((EX.a, EX.label, Literal('say "hi"\\ back\nand\r\nagain', lang='en')))
+    g.add((EX.a, EX.note, Literal('plain "quoted" \\ text')))
+    g.add((EX.a, EX.amount, Literal('20', datatype=XSD.int)))
+    g.add((EX.a, EX.merged, Literal('20+20', datatype=XSD.int)))
+    # local names that are not valid Turtle prefixed names
+    g.add((EX.a, EX.link, URIRef(EX + 'item(1)')))
+    g.add((EX.a, EX.link, URIRef(EX + 'trailing.')))
+    g.add((URIRef('http://other.org/x'), EX.node, BNode('b1')))
+    g.add((BNode('b1'), EX.value, Literal('')))
+    return g
+
+
+@pytest.mark.parametrize('output_format, compress', FORMATS)
+def test_round_trip(tmp_path, output_format, compress):
+    g = sample_graph()
+    destination = str(tmp_path / f'graph{get_extension(output_format, compress)}')
+    save_graph(g, destination, output_format, compress)
+    assert isomorphic(read_graph(destination), g)
+    assert not os.path.exists(destination + '.part')
+
+
+@pytest.mark.parametrize('output_format, compress', FORMATS)
+def test_graph_bytes_matches_file(tmp_path, output_format, compress):
+    g = sample_graph()
+    destination = str(tmp_path / f'graph{get_extension(output_format, compress)}')
+    save_graph(g, destination, output_format, compress)
+    with open(destination, 'rb') as f:
+        assert f.read() == graph_bytes(g, output_format, compress)
+
+
+@pytest.mark.parametrize('output_format, compress', FORMATS)
+def test_invalid_iris_are_escaped(tmp_path, output_format, compress):
+    # characters that IRIs may not contain, also in a namespace
+    g = Graph()
+    g.bind('bad', Namespace('http://example.org/bad ns#'))
+    for name in ('with space', 'a>b', 'q"uote', 'back\\slash', '{braces}'):
+        g.add((EX.a, EX.link, URIRef(EX + name)))
+    g.add((URIRef('http://example.org/bad ns#a'), EX.amount, Literal('1', datatype=URIRef(EX + 'my type'))))
+    destination = str(tmp_path / f'graph{get_extension(output_format, compress)}')
+    save_graph(g, destination, output_format, compress)
+    # rdflib cannot compare graphs with such IRIs
+    assert set(read_graph(destination)) == set(g)
+
+
+def test_invalid_local_names_fall_back_to_iris():
+    out = io.BytesIO()
+    write_graph(sample_graph(), out, 'turtle')
+    text = out.getvalue().decode('utf-8')
+    assert f'<{EX}item(1)>' in text
+    assert f'<{EX}trailing.>' in text
+    assert 'ex:Thing' in text
+    # only the prefixes used are declared
+    assert '@prefix ex:' in text and '@prefix rdf:' not in text
+
+
+@pytest.mark.parametrize('output_format, compress', FORMATS)
+def test_deterministic_output(output_format, compress):
+    g = sample_graph()
+    shuffled = Graph()
+    shuffled.bind('ex', EX)
+    for triple in sorted(g, key=str, reverse=True):
+        shuffled.add(triple)
+    assert graph_bytes(g, output_format, compress) == graph_bytes(shuffled, output_format, compress)
+
+
+@pytest.mark.parametrize('output_format, compress', FORMATS)
+def test_round_trip_assessment(tmp_path, output_format, compress):
+    g = read_graph(os.path.join(ROOT, 'arti', 'in', 'EIF-5.1.0-CAMSSAssessment_CLV.ttl'))
+    destination = str(tmp_path / f'graph{get_extension(output_format, compress)}')
+    save_graph(g, destination, output_format, compress)
+    assert isomorphic(read_graph(destination), g)
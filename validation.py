@@ -0,0 +1,132 @@
+import os
+import csv
+import re
+from rdflib import URIRef, Literal
+from rdflib.namespace import RDF, XSD
+from namespaces import CAMSS, CAV
+
+# lexical forms of xsd:int values
+INT_PATTERN = re.compile(r'[+-]?[0-9]+')
+INT_RANGE = range(-2 ** 31, 2 ** 31)
+# columns of the validation report
+COLUMNS = ['Specification', 'Assessment', 'Issue']
+
+
+def is_int(value) -> bool:
+    """
+    Checks whether a value is a valid xsd:int literal.
+    :param value: RDF term
+    :return: True if the value is an xsd:int literal with a lexical form in the range of xsd:int
+    """
+    return isinstance(value, Literal) and value.datatype == XSD.int and INT_PATTERN.fullmatch(str(value)) is not None \
+        and int(str(value)) in INT_RANGE
+
+
+class ShapeValidator:
+    """
+    Precompiled checks of the shape of migrated individual assessment graphs, a light stand-in for SHACL shapes of
+    the latest scenario: the assessment results in exactly one statement per criterion of the scenario, each
+    statement refers to a single cav:Score with a single xsd:int value assigned to a criterion of the scenario, and
+    the assessment is contextualised by the scenario and has the tool version of the scenario. The triples are read
+    in a single pass, indexing only the predicates that are checked, so validation takes time linear in the number
+    of triples.
+    """
+    criteria: frozenset  # criteria of the scenario
+    context: URIRef  # scenario that contextualises the assessments
+    tool_version: URIRef
+    predicates: tuple  # predicates that are checked
+
+    def __init__(self, criteria: list, context: URIRef, tool_version: URIRef):
+        """
+        :param criteria: URIs of the criteria of the scenario
+        :param context: URI of the scenario
+        :param tool_version: URI of the tool version of the scenario
+        """
+        self.criteria = frozenset(criteria)
+        self.context = context
+        self.tool_version = tool_version
+        self.predicates = (RDF.type, CAV.resultsIn, CAV.refersTo, CAV.value, CAV.assignedTo, CAV.contextualisedBy,
+                           CAMSS.toolVersion)
+        return
+
+    def validate(self, ass_uri: URIRef, triples) -> list:
+        """
+        Checks the migrated triples of an assessment.
+        :param ass_uri: URI of the assessment
+        :param triples: migrated triples
+        :return: list of issues, empty if the graph is valid
+        """
+        index = {p: {} for p in self.predicates}
+        for s, p, o in triples:
+            objects = index.get(p)
+            if objects is not None:
+                objects.setdefault(s, []).append(o)
+        issues = []
+        context = index[CAV.contextualisedBy].get(ass_uri, [])
+        if context != [self.context]:
+            issues.append(f"cav:contextualisedBy is {', '.join(map(str, context)) or 'missing'} "
+                          f"instead of {self.context}")
+        tool_version = index[CAMSS.toolVersion].get(ass_uri, [])
+        if tool_version != [self.tool_version]:
+            issues.append(f"camss:toolVersion is {', '.join(map(str, tool_version)) or 'missing'} "
+                          f"instead of {self.tool_version}")
+        statements = index[CAV.resultsIn].get(ass_uri, [])
+        if len(statements) != len(self.criteria):
+            issues.append(f"{len(statements)} cav:resultsIn statements instead of {len(self.criteria)}")
+        for statement in statements:
+            scores = index[CAV.refersTo].get(statement, [])
+            if len(scores) != 1:
+                issues.append(f"statement {statement} refers to {len(scores)} scores instead of 1")
+                continue
+            score = scores[0]
+            if CAV.Score not in index[RDF.type].get(score, []):
+                issues.append(f"score {score} is not a cav:Score")
+            values = index[CAV.value].get(score, [])
+            if len(values) != 1 or not is_int(values[0]):
+                issues.append(f"score {score} has value {', '.join(map(repr, map(str, values))) or 'missing'} "
+                              f"instead of a single xsd:int")
+            criteria = index[CAV.assignedTo].get(score, [])
+            if len(criteria) != 1 or criteria[0] not in self.criteria:
+                issues.append(f"score {score} is assigned to {', '.join(map(str, criteria)) or 'nothing'} "
+                              f"instead of a single criterion of the scenario")
+        return issues
+
+
+class ValidationReport:
+    """
+    Table of the issues found by the validation of the migrated graphs, one row per issue. Issues do not stop the
+    migration; the table is written at the end of the run, with only its header when every graph is valid.
+    """
+    path: str
+    rows: list
+
+    def __init__(self, path: str = 'arti/punct/EIFScenario600-validation.csv'):
+        """
+        :param path: filepath of the table
+        """
+        self.path = path
+        self.rows = []
+        return
+
+    def add(self, name: str, ass_id: str, issues: list):
+        """
+        Adds the issues of an assessment.
+        :param name: name of the assessment
+        :param ass_id: identifier of the assessment
+        :param issues: issues found
+        :return: rows added
+        """
+        self.rows.extend([name, ass_id, issue] for issue in issues)
+        return
+
+    def close(self) -> str:
+        """
+        Writes the table.
+        :return: filepath of the table
+        """
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, 'w', newline='') as out:
+            writer = csv.writer(out, lineterminator='\n')
+            writer.writerow(COLUMNS)
+            writer.writerows(self.rows)
+        return self.path
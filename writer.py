@@ -0,0 +1,284 @@
+import io
+import os
+import re
+import gzip
+from contextlib import contextmanager
+from rdflib import Literal, BNode, Graph
+from rdflib.namespace import RDF
+
+# formats of the serialised graphs and their file extensions
+FORMATS = {'turtle': '.ttl', 'nt': '.nt'}
+# local names that are written as prefixed names, a conservative subset of the Turtle PN_LOCAL production
+LOCAL_CHARS = set('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_-.')
+# characters that IRI references may not contain, written as numeric escapes
+IRI_ESCAPED = re.compile(r'[\x00-\x20<>"{}|^`\\]')
+
+
+def escape(value: str) -> str:
+    """
+    Escapes a string for a quoted literal in N-Triples or Turtle.
+    :param value: lexical form of the literal
+    :return: escaped string
+    """
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n').replace('\r', '\\r')
+
+
+def iri_ref(value: str) -> str:
+    """
+    Formats an IRI reference for N-Triples or Turtle, escaping the characters that IRIs may not contain, so that
+    the output stays parseable.
+    :param value: IRI
+    :return: IRI reference
+    """
+    if IRI_ESCAPED.search(value) is None:
+        return f'<{value}>'
+    return '<' + IRI_ESCAPED.sub(lambda match: '\\u%04X' % ord(match.group()), value) + '>'
+
+
+def nt_term(term) -> str:
+    """
+    Formats an RDF term in the N-Triples syntax.
+    :param term: URI, literal or blank node
+    :return: N-Triples representation of the term
+    """
+    if isinstance(term, Literal):
+        value = escape(str(term))
+        if term.language:
+            return f'"{value}"@{term.language}'
+        if term.datatype:
+            return f'"{value}"^^{iri_ref(term.datatype)}'
+        return f'"{value}"'
+    if isinstance(term, BNode):
+        return f'_:{term}'
+    return iri_ref(term)
+
+
+def nt_line(triple: tuple) -> str:
+    """
+    Formats a triple as an N-Triples statement.
+    :param triple: subject, predicate and object
+    :return: N-Triples line of the triple
+    """
+    s, p, o = triple
+    return f'{nt_term(s)} {nt_term(p)} {nt_term(o)} .\n'
+
+
+class TurtleTerms:
+    """
+    Formats RDF terms in the Turtle syntax, as prefixed names when their namespace is bound in the graph, and keeps
+    track of the prefixes used. Formatted IRIs are cached, as the same criteria, types and predicates recur in
+    every assessment.
+    """
+    prefixes: dict  # prefix per namespace
+    used: dict  # namespace per prefix used
+    cache: dict  # Turtle representation per IRI
+
+    def __init__(self, namespaces):
+        """
+        :param namespaces: prefix and namespace pairs bound in the graph
+        """
+        self.prefixes = {str(namespace): prefix for prefix, namespace in namespaces}
+        self.used = {}
+        self.cache = {}
+        return
+
+    def iri(self, term) -> str:
+        """
+        :param term: URI
+        :return: prefixed name or IRI reference
+        """
+        text = self.cache.get(term)
+        if text is None:
+            value = str(term)
+            split = max(value.rfind('#'), value.rfind('/')) + 1
+            prefix = self.prefixes.get(value[:split])
+            local = value[split:]
+            if prefix is not None and (local == '' or (set(local) <= LOCAL_CHARS and local[-1] != '.'
+                                                       and local[0] not in '-.')):
+                self.used[prefix] = value[:split]
+                text = f'{prefix}:{local}'
+            else:
+                text = iri_ref(value)
+            self.cache[term] = text
+        return text
+
+    def use(self, term):
+        """
+        Records the prefix of a term, if any, without formatting it.
+        :param term: URI, literal or blank node
+        :return: prefix recorded
+        """
+        if isinstance(term, Literal):
+            if term.datatype and not term.language:
+                self.iri(term.datatype)
+        elif not isinstance(term, BNode):
+            self.iri(term)
+        return
+
+    def term(self, term) -> str:
+        """
+        :param term: URI, literal or blank node
+        :return: Turtle representation of the term
+        """
+        if isinstance(term, Literal):
+            value = escape(str(term))
+            if term.language:
+                return f'"{value}"@{term.language}'
+            if term.datatype:
+                return f'"{value}"^^{self.iri(term.datatype)}'
+            return f'"{value}"'
+        if isinstance(term, BNode):
+            return f'_:{term}'
+        return self.iri(term)
+
+
+def sort_key(term) -> tuple:
+    """
+    Orders terms deterministically: URIs, then blank nodes, then literals, each by their lexical form.
+    :param term: URI, literal or blank node
+    :return: sort key
+    """
+    if isinstance(term, Literal):
+        return 2, str(term), term.language or '', str(term.datatype or '')
+    return (1 if isinstance(term, BNode) else 0), str(term), '', ''
+
+
+def write_graph(g: Graph, out, output_format: str = 'turtle'):
+    """
+    Writes a graph in a deterministic order: subjects, predicates (rdf:type first) and objects are sorted. Turtle
+    output groups the predicates of a subject and the objects of a predicate, and only declares the prefixes used,
+    which are collected from the IRIs before the statements are written, one subject at a time as they are
+    formatted. The graph is read in a single pass.
+    :param g: graph
+    :param out: binary file
+    :param output_format: 'turtle' or 'nt'
+    :return: graph written
+    """
+    subjects = {}
+    for s, p, o in g:
+        subjects.setdefault(s, {}).setdefault(p, []).append(o)
+    order = sorted(subjects, key=sort_key)
+    if output_format == 'nt':
+        for s in order:
+            predicates = subjects[s]
+            for p in sorted(predicates, key=lambda p: (p != RDF.type, str(p))):
+                for o in sorted(predicates[p], key=sort_key):
+                    out.write(nt_line((s, p, o)).encode('utf-8'))
+        return
+    terms = TurtleTerms(g.namespaces())
+    for s, predicates in subjects.items():
+        terms.use(s)
+        for p, objects in predicates.items():
+            if p != RDF.type:
+                terms.use(p)
+            for o in objects:
+                terms.use(o)
+    for prefix in sorted(terms.used):
+        out.write(f'@prefix {prefix}: {iri_ref(terms.used[prefix])} .\n'.encode('utf-8'))
+    out.write(b'\n')
+    for s in order:
+        predicates = subjects[s]
+        lines = []
+        for p in sorted(predicates, key=lambda p: (p != RDF.type, str(p))):
+            objects = ', '.join(terms.term(o) for o in sorted(predicates[p], key=sort_key))
+            lines.append(f"{'a' if p == RDF.type else terms.iri(p)} {objects}")
+        out.write((f"{terms.term(s)} " + ' ;\n    '.join(lines) + ' .\n\n').encode('utf-8'))
+    return
+
+
+def graph_bytes(g: Graph, output_format: str = 'turtle', compress: bool = False) -> bytes:
+    """
+    Serialises a graph in memory.
+    :param g: graph
+    :param output_format: 'turtle' or 'nt'
+    :param compress: gzip-compress the output
+    :return: serialised graph
+    """
+    buffer = io.BytesIO()
+    if compress:
+        # no filename nor timestamp in the header, so that identical graphs give identical files
+        with gzip.GzipFile(filename='', mode='wb', fileobj=buffer, mtime=0) as out:
+            write_graph(g, out, output_format)
+    else:
+        write_graph(g, buffer, output_format)
+    return buffer.getvalue()
+
+
+def save_graph(g: Graph, destination: str, output_format: str = 'turtle', compress: bool = False):
+    """
+    Writes a graph to a temporary file moved in place once complete, so that an interrupted run leaves no partial
+    graph.
+    :param g: graph
+    :param destination: filepath of the graph
+    :param output_format: 'turtle' or 'nt'
+    :param compress: gzip-compress the output
+    :return: graph written
+    """
+    with atomic_file(destination) as f:
+        if compress:
+            with gzip.GzipFile(filename='', mode='wb', fileobj=f, mtime=0) as out:
+                write_graph(g, out, output_format)
+        else:
+            write_graph(g, f, output_format)
+    return
+
+
+@contextmanager
+def atomic_file(path: str, mode: str = 'wb'):
+    """
+    Opens a temporary file that is moved in place once complete, so that an interrupted write leaves the previous
+    file instead of a partial one. The temporary file is named after the process, as several processes may write
+    the same file, and it is removed if the write fails.
+    :param path: filepath
+    :param mode: 'wb', or 'w' for text
+    :return: the temporary file
+    """
+    part = f'{path}.{os.getpid()}.part'
+    try:
+        with open(part, mode) as f:
+            yield f
+        os.replace(part, path)
+    except BaseException:
+        if os.path.exists(part):
+            os.remove(part)
+        raise
+
+
+def write_file(path: str, data: bytes):
+    """
+    Writes a file atomically.
+    :param path: filepath
+    :param data: content of the file
+    :return: file written
+    """
+    with atomic_file(path) as f:
+        f.write(data)
+    return
+
+
+def get_extension(output_format: str = 'turtle', compress: bool = False) -> str:
+    """
+    :param output_format: 'turtle' or 'nt'
+    :param compress: gzip-compressed output
+    :return: file extension of the serialised graphs
+    """
+    return FORMATS[output_format] + ('.gz' if compress else '')
+
+
+def read_graph(path: str, data: bytes = None) -> Graph:
+    """
+    Parses a Turtle or N-Triples file, possibly gzip-compressed, according to its extension.
+    :param path: filepath of the graph
+    :param data: content of the file, when already read
+    :return: the graph
+    """
+    raw = open(path, 'rb') if data is None else io.BytesIO(data)
+    source = raw
+    if path.endswith('.gz'):
+        source = gzip.GzipFile(fileobj=raw, mode='rb')
+        path = path[:-3]
+    g = Graph()
+    g.parse(source, format='nt' if os.path.splitext(path)[1] == '.nt' else 'turtle')
+    source.close()
+    raw.close()
+    return g